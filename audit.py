@@ -0,0 +1,179 @@
+import argparse
+import os
+import sys
+import time
+
+from tictactoe import computer_strategy, switch_turn
+from solver import move_score, solve, winner
+
+BASELINE_PATH = 'audit_baseline.txt'    # Findings already known about, one format_finding() line each
+
+def classify(best_score, score):
+
+    """
+    Names what a move gives away compared with perfect play
+
+    Parameters:
+    - best_score (int): solve() score of the position for the player to move
+    - score (int): move_score() of the move played
+
+    Returns:
+    - 'win' if a won position is no longer won, 'draw' if a drawn position is now lost, otherwise None
+    """
+
+    if best_score > 0 >= score:
+        return 'win'
+    if best_score == 0 > score:
+        return 'draw'
+
+    return None
+
+def audit_position(board_state, X_or_O, computer, strategy, seen, findings):
+
+    """
+    Audits one position and every position reachable from it, playing every human move
+    and every move the strategy could choose. Moves are made and undone on board_state
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+    - X_or_O (string): This is the symbol of the player to move
+    - computer (string): This is the symbol the strategy plays
+    - strategy (function): Pipeline from build_pipeline() playing for the computer
+    - seen (set): Positions already audited, as cells strings
+    - findings (list): Findings are appended here as dictionaries
+
+    Returns:
+    - None
+    """
+
+    cells = ''.join(cell for row in board_state for cell in row)
+    if cells in seen or winner(cells) or '_' not in cells:
+        return
+    seen.add(cells)
+
+    other = switch_turn(X_or_O)
+    if X_or_O == computer:
+        moves = strategy.candidates(board_state, X_or_O)
+        best_score = solve(cells, X_or_O)
+        for row, col in moves:
+            square = row * 3 + col
+            score = move_score(solve(cells[:square] + X_or_O + cells[square + 1:], other))
+            gives_away = classify(best_score, score)
+            if gives_away:
+                findings.append({'cells': cells, 'computer': X_or_O, 'move': (row, col),
+                                 'gives_away': gives_away, 'best_score': best_score, 'score': score})
+    else:
+        moves = [[row, col] for row in range(3) for col in range(3) if board_state[row][col] == '_']
+
+    for row, col in moves:
+        board_state[row][col] = X_or_O
+        audit_position(board_state, other, computer, strategy, seen, findings)
+        board_state[row][col] = '_'
+
+def audit(strategy = computer_strategy):
+
+    """
+    Compares a computer strategy with perfect play in every position it can reach,
+    playing first and second, and covering every random choice it could make
+
+    Parameters:
+    - strategy (function): Pipeline from build_pipeline(), defaults to the game's computer player
+
+    Returns:
+    - findings (list): One dictionary per move which gives away a win or a draw, with keys
+      cells, computer, move, gives_away ('win' or 'draw'), best_score and score
+    - positions (int): Number of positions audited
+    """
+
+    findings = []
+    positions = 0
+    for computer in ('X', 'O'):
+        seen = set()
+        audit_position([['_'] * 3 for _ in range(3)], 'X', computer, strategy, seen, findings)
+        positions += len(seen)
+
+    return findings, positions
+
+def format_finding(finding):
+
+    """
+    Formats a finding as one line, eg "O to move X_X_O____: plays (1, 0), gives away draw (best 0, got -7)"
+    """
+
+    return "{} to move {}: plays {}, gives away {} (best {}, got {})".format(
+        finding['computer'], finding['cells'], finding['move'], finding['gives_away'],
+        finding['best_score'], finding['score'])
+
+def read_baseline(baseline_file):
+
+    """
+    Reads the findings recorded in a baseline file, skipping blank lines and lines starting with '#'
+
+    Parameters:
+    - baseline_file (file): Open text file written by write_baseline()
+
+    Returns:
+    - baseline (set): format_finding() lines
+    """
+
+    return {line.strip() for line in baseline_file if line.strip() and not line.startswith('#')}
+
+def write_baseline(baseline_file, findings):
+
+    """
+    Records findings as the known baseline, one format_finding() line each, sorted so diffs stay small
+    """
+
+    baseline_file.write("# Known audit findings, written by python audit.py --update-baseline\n")
+    for line in sorted(format_finding(finding) for finding in findings):
+        baseline_file.write(line + '\n')
+
+def compare_baseline(findings, baseline):
+
+    """
+    Splits findings into new ones and those already recorded
+
+    Parameters:
+    - findings (list): Output of audit()
+    - baseline (set): Output of read_baseline()
+
+    Returns:
+    - new (list): Findings not in the baseline
+    - fixed (list): Baseline lines with no matching finding any more
+    """
+
+    lines = {format_finding(finding) for finding in findings}
+    new = [finding for finding in findings if format_finding(finding) not in baseline]
+
+    return new, sorted(baseline - lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Audit the computer's heuristics against perfect play")
+    parser.add_argument('--baseline', default = BASELINE_PATH,
+                        help = "Known findings, which do not fail the audit (default {})".format(BASELINE_PATH))
+    parser.add_argument('--update-baseline', action = 'store_true', help = "Record the current findings as the baseline")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    findings, positions = audit()
+    elapsed = time.perf_counter() - start
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            write_baseline(baseline_file, findings)
+        print("{} findings recorded in {}".format(len(findings), args.baseline))
+        sys.exit(0)
+
+    baseline = set()
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = read_baseline(baseline_file)
+    new, fixed = compare_baseline(findings, baseline)
+
+    for finding in findings:
+        print(("NEW " if finding in new else "") + format_finding(finding))
+    for line in fixed:
+        print("FIXED " + line)
+    print("{} findings in {} positions, {} new, {} fixed ({:.3f}s)".format(len(findings), positions, len(new),
+                                                                          len(fixed), elapsed))
+    sys.exit(1 if new else 0)
@@ -0,0 +1,198 @@
+import asyncio
+import struct
+
+from tictactoe import apply_move
+
+MOVE = struct.Struct('<cIBc')       # b'M', sequence, square (row * 3 + col), symbol
+SNAPSHOT = struct.Struct('<cI9s')   # b'S', sequence, the nine squares in row order
+END = struct.Struct('<cIc')         # b'E', sequence, b'X', b'O' or b'D' for a draw
+KICKED = struct.Struct('<cI')       # b'K', sequence; the spectator was too slow and has been dropped
+QUEUE_SIZE = 64                     # Messages a spectator may fall behind by before it is resynced or dropped
+
+class Subscription:
+
+    """
+    One spectator's view of a game: a bounded queue of encoded messages, read with
+    "async for message in subscription". Iteration ends after an end or kicked message
+    """
+
+    def __init__(self, queue_size):
+        self.queue = asyncio.Queue(maxsize = queue_size)
+        self.resyncs = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.queue is None:
+            raise StopAsyncIteration
+        message = await self.queue.get()
+        if message[:1] in (b'E', b'K'):
+            self.queue = None                   # Last message for this spectator
+        return message
+
+    def replace_with(self, *messages):
+
+        """
+        Discards everything the spectator has not read yet and queues messages in its place,
+        keeping the last ones if they do not all fit
+        """
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        for message in messages[-self.queue.maxsize:]:
+            self.queue.put_nowait(message)
+
+class Broadcaster:
+
+    """
+    Hosts one game and fans every move out to its spectators. Each move is encoded once as a
+    small diff and the same bytes are queued for every spectator without waiting, so the game
+    never stalls. A spectator whose queue is full is either sent a snapshot in place of the
+    moves it missed, or dropped. Must be used from the thread running the event loop
+    """
+
+    def __init__(self, queue_size = QUEUE_SIZE, drop_slow = False):
+
+        """
+        Parameters:
+        - queue_size (int): Messages each spectator may fall behind by
+        - drop_slow (boolean): Drop spectators who fall behind instead of sending them a snapshot
+        """
+
+        self.board_state = [['_'] * 3 for _ in range(3)]
+        self.queue_size = queue_size
+        self.drop_slow = drop_slow
+        self.subscribers = set()
+        self.sequence = 0
+        self.board_sequence = 0         # Sequence of the last move on the board, which snapshots carry
+        self.snapshot_cache = None      # (sequence, encoded snapshot), so it is encoded once per move
+        self.finished = None            # Encoded end message once the game is over
+
+    def snapshot(self):
+
+        """
+        Returns the current board encoded as a snapshot message
+        """
+
+        if not self.snapshot_cache or self.snapshot_cache[0] != self.board_sequence:
+            cells = ''.join(cell for row in self.board_state for cell in row).encode()
+            self.snapshot_cache = (self.board_sequence, SNAPSHOT.pack(b'S', self.board_sequence, cells))
+
+        return self.snapshot_cache[1]
+
+    def subscribe(self):
+
+        """
+        Adds a spectator, whose first message is a snapshot of the board
+
+        Parameters:
+        - None
+
+        Returns:
+        - subscription (Subscription): Async iterator of encoded messages
+        """
+
+        subscription = Subscription(self.queue_size)
+        if self.finished:                       # Keeps the end message even with room for only one
+            subscription.replace_with(self.snapshot(), self.finished)
+        else:
+            subscription.queue.put_nowait(self.snapshot())
+            self.subscribers.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    def publish(self, message):
+
+        """
+        Queues one encoded message for every spectator without waiting
+
+        Parameters:
+        - message (bytes): Encoded message, shared by every spectator
+
+        Returns:
+        - None
+        """
+
+        for subscription in list(self.subscribers):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                if self.drop_slow:
+                    subscription.replace_with(KICKED.pack(b'K', self.sequence))
+                    self.subscribers.discard(subscription)
+                elif message[:1] == b'E':                   # Snapshot, then the end so the spectator's stream finishes
+                    subscription.replace_with(self.snapshot(), message)
+                    subscription.resyncs += 1
+                else:                                       # Snapshot already includes this move
+                    subscription.replace_with(self.snapshot())
+                    subscription.resyncs += 1
+
+    def play(self, move, X_or_O):
+
+        """
+        Plays a move on the hosted board and broadcasts it, followed by an end message if it ends the game
+
+        Parameters:
+        - move (tuple): (row, col) of the square to play
+        - X_or_O (string): This is the symbol being played
+
+        Returns:
+        - outcome (string): 'win', 'draw' or 'continue', as returned by apply_move()
+
+        Raises:
+        - ValueError: If the game is over, X_or_O is not 'X' or 'O' or the move is not to an empty square
+        """
+
+        if self.finished:
+            raise ValueError("Game is over in play().")
+
+        outcome = apply_move(self.board_state, move, X_or_O)
+        self.sequence += 1
+        self.board_sequence = self.sequence     # The end message comes after, so it is newer than any snapshot
+        self.publish(MOVE.pack(b'M', self.sequence, move[0] * 3 + move[1], X_or_O.encode()))
+
+        if outcome != 'continue':
+            self.sequence += 1
+            self.finished = END.pack(b'E', self.sequence, X_or_O.encode() if outcome == 'win' else b'D')
+            self.publish(self.finished)
+            self.subscribers.clear()
+
+        return outcome
+
+def decode_message(message):
+
+    """
+    Decodes a broadcast message for a spectator
+
+    Parameters:
+    - message (bytes): Message read from a Subscription
+
+    Returns:
+    - ('move', sequence, (row, col), symbol), ('snapshot', sequence, cells),
+      ('end', sequence, 'X', 'O' or 'draw') or ('kicked', sequence)
+
+    Raises:
+    - ValueError: If the message is not a broadcast message
+    """
+
+    kind = message[:1]
+    try:
+        if kind == b'M':
+            _, sequence, square, symbol = MOVE.unpack(message)
+            return 'move', sequence, divmod(square, 3), symbol.decode()
+        if kind == b'S':
+            _, sequence, cells = SNAPSHOT.unpack(message)
+            return 'snapshot', sequence, cells.decode()
+        if kind == b'E':
+            _, sequence, result = END.unpack(message)
+            return 'end', sequence, 'draw' if result == b'D' else result.decode()
+        if kind == b'K':
+            return 'kicked', KICKED.unpack(message)[1]
+    except struct.error:
+        pass
+
+    raise ValueError("Unexpected message in decode_message().")
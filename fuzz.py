@@ -0,0 +1,404 @@
+import argparse
+import copy
+import random
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+import tictactoe
+from tictactoe import allowed_symbols
+
+CHUNK_SIZE = 20000          # Cases per worker task
+MAX_FAILURES = 5            # Failures each worker task shrinks and reports
+SYMBOLS = ('_', 'X', 'O')
+ODD_VALUES = ('Z', '', 'x', 'XX', None, 0, 1.5, True, ('X',), ['X'], {'X': 1})    # Malformed cells and symbols
+ODD_COORDS = (-2, 3, 4, 1.5, 2.0, '1', None, True, False, [1], 10 ** 20)         # Malformed rows and columns
+
+# Reference implementations: the original list-of-lists code, kept unchanged as the
+# specification the table-driven paths in tictactoe.py must match
+
+def reference_correct_board_state(board_state):
+    if not isinstance(board_state, list) or len(board_state) != 3 or any(len(row) != 3 for row in board_state):
+        raise ValueError("Invalid board_state. Must be 3x3 matrix.")
+
+    if any(symbol not in allowed_symbols for row in board_state for symbol in row):
+        raise ValueError("Unexpected symbols in board_state in three_in_a_row(). Must be ('_', 'X' or 'O').")
+
+def reference_three_in_a_row(board_state, X_or_O):
+    reference_correct_board_state(board_state)
+
+    try:
+        for row in board_state:
+            if all(cell == X_or_O for cell in row):
+                return True
+
+        for col in range(3):
+            if all(board_state[row][col] == X_or_O for row in range(3)):
+                return True
+
+        if all(board_state[i][i] == X_or_O for i in range(3)) or all(board_state[i][2 - i] == X_or_O for i in range(3)):
+            return True
+
+    except(IndexError, TypeError):
+        raise IndexError("Index or out of bounds error in board_state in draw_board()")
+
+    return False
+
+def reference_is_legal_move(board_state, row, col):
+    reference_correct_board_state(board_state)
+
+    return -1 < row < 3 and -1 < col < 3 and board_state[row][col] == '_'
+
+def reference_switch_turn(X_or_O):
+    if X_or_O not in allowed_symbols:
+        raise ValueError("Unexpected symbols in board_state in three_in_a_row(). Must be ('_', 'X' or 'O').")
+
+    return 'O' if X_or_O == 'X' else 'X'
+
+def reference_collect_legal_moves(board_state):
+    reference_correct_board_state(board_state)
+
+    legal_moves = []
+    for row in range(3):
+        for col in range(3):
+            try:
+                if reference_is_legal_move(board_state, row ,col):
+                    legal_moves.append([row, col])
+            except ValueError:
+                pass
+
+    return legal_moves
+
+def reference_find_win(board_state, legal_moves, X_or_O, move_made):
+    reference_correct_board_state(board_state)
+
+    if move_made[0]:
+        return
+
+    for move in legal_moves:
+        temp_board_state = copy.deepcopy(board_state)
+        temp_board_state[move[0]][move[1]] = X_or_O
+        try:
+            if reference_three_in_a_row(temp_board_state, X_or_O):
+                board_state[move[0]][move[1]] = X_or_O
+                move_made[0] = True
+                return False
+        except Exception:
+            pass
+
+def reference_find_block(board_state, legal_moves, X_or_O, move_made):
+    reference_correct_board_state(board_state)
+
+    if move_made[0]:
+        return
+
+    for move in legal_moves:
+        temp_board_state = copy.deepcopy(board_state)
+        temp_X_or_O = 'O' if X_or_O == 'X' else 'X'
+        temp_board_state[move[0]][move[1]] = temp_X_or_O
+        try:
+            if reference_three_in_a_row(temp_board_state, temp_X_or_O):
+                board_state[move[0]][move[1]] = X_or_O
+                move_made[0] = True
+                return reference_switch_turn(X_or_O)
+        except Exception:
+            pass
+
+def random_board(rng):
+
+    """
+    Returns a 3x3 board with every square drawn uniformly, reachable in play or not
+    """
+
+    return [[rng.choice(SYMBOLS) for _ in range(3)] for _ in range(3)]
+
+def adversarial_board(rng):
+
+    """
+    Returns a 3x3 board from random play, which may carry on past a win, sometimes with
+    two of a line filled in so win and block checks have something to find
+    """
+
+    board = [['_'] * 3 for _ in range(3)]
+    empty = [(row, col) for row in range(3) for col in range(3)]
+    rng.shuffle(empty)
+    X_or_O = rng.choice(('X', 'O'))
+    for row, col in empty[:rng.randint(0, 9)]:
+        board[row][col] = X_or_O
+        X_or_O = 'O' if X_or_O == 'X' else 'X'
+
+    if rng.random() < 0.5:
+        line = rng.choice(tictactoe.WIN_LINES)
+        symbol = rng.choice(('X', 'O'))
+        for square in rng.sample(line, 2):
+            board[square // 3][square % 3] = symbol
+
+    return board
+
+def malformed_board(rng):
+
+    """
+    Returns a board which breaks one rule: wrong shape, wrong container or an unexpected cell
+    """
+
+    board = random_board(rng)
+    kind = rng.randrange(8)
+    if kind == 0:                                   # Unexpected cell
+        board[rng.randrange(3)][rng.randrange(3)] = rng.choice(ODD_VALUES)
+    elif kind == 1:                                 # Missing or extra row
+        if rng.random() < 0.5:
+            board.pop()
+        else:
+            board.append(list(board[0]))
+    elif kind == 2:                                 # Short or long row
+        row = board[rng.randrange(3)]
+        if rng.random() < 0.5:
+            row.pop()
+        else:
+            row.append('_')
+    elif kind == 3:                                 # Row as a tuple or string
+        index = rng.randrange(3)
+        board[index] = tuple(board[index]) if rng.random() < 0.5 else ''.join(board[index])
+    elif kind == 4:                                 # Row which is not a sequence
+        board[rng.randrange(3)] = rng.choice((None, 3, 'XO', {'X': 1}))
+    elif kind == 5:                                 # Row of three symbols which is not a sequence
+        symbols = rng.sample(SYMBOLS, 3)
+        board[rng.randrange(3)] = set(symbols) if rng.random() < 0.5 else dict.fromkeys(symbols, 1)
+    elif kind == 6:                                 # Board which is not a list
+        board = tuple(board) if rng.random() < 0.5 else rng.choice((None, '', 'X_O_X_O_X', 9))
+    else:                                           # Empty board or empty rows
+        board = [] if rng.random() < 0.5 else [[], [], []]
+
+    return board
+
+def any_board(rng):
+    roll = rng.random()
+    if roll < 0.4:
+        return random_board(rng)
+    if roll < 0.8:
+        return adversarial_board(rng)
+    return malformed_board(rng)
+
+def any_symbol(rng):
+    roll = rng.random()
+    if roll < 0.8:
+        return rng.choice(('X', 'O'))
+    if roll < 0.9:
+        return '_'
+    return rng.choice(ODD_VALUES)
+
+def any_coord(rng):
+    return rng.randrange(-1, 4) if rng.random() < 0.9 else rng.choice(ODD_COORDS)
+
+def legal_moves_for(rng, board):
+
+    """
+    Returns the legal moves in reference order, or a shuffled subset of them
+    """
+
+    moves = reference_collect_legal_moves(board)
+    if rng.random() < 0.3:
+        moves = rng.sample(moves, rng.randint(0, len(moves)))
+
+    return moves
+
+def find_args(rng):
+
+    """
+    Arguments for find_win() and find_block(). Legal moves are only generated for boards
+    the reference can list them for, malformed boards get an empty or arbitrary list
+    """
+
+    board = any_board(rng)
+    try:
+        moves = legal_moves_for(rng, board)
+    except (IndexError, KeyError, TypeError, ValueError):
+        moves = rng.choice(([], [[0, 0]], [[1, 1], [2, 2]]))
+
+    return board, moves, any_symbol(rng), [rng.random() < 0.1]
+
+TARGETS = {                 # Name -> (reference, fast path, argument generator)
+    'correct_board_state': (reference_correct_board_state, tictactoe.correct_board_state,
+                            lambda rng: (any_board(rng),)),
+    'three_in_a_row': (reference_three_in_a_row, tictactoe.three_in_a_row,
+                       lambda rng: (any_board(rng), any_symbol(rng))),
+    'is_legal_move': (reference_is_legal_move, tictactoe.is_legal_move,
+                      lambda rng: (any_board(rng), any_coord(rng), any_coord(rng))),
+    'switch_turn': (reference_switch_turn, tictactoe.switch_turn,
+                    lambda rng: (any_symbol(rng),)),
+    'collect_legal_moves': (reference_collect_legal_moves, tictactoe.collect_legal_moves,
+                            lambda rng: (any_board(rng),)),
+    'find_win': (reference_find_win, tictactoe.find_win, find_args),
+    'find_block': (reference_find_block, tictactoe.find_block, find_args),
+}
+
+def clone(value):
+
+    """
+    Copies the lists, tuples and dicts in a case, which is all copy.deepcopy() would need to do, faster
+    """
+
+    if isinstance(value, list):
+        return [clone(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(clone(item) for item in value)
+    if isinstance(value, dict):
+        return {key: clone(item) for key, item in value.items()}
+
+    return value
+
+def outcome(function, args):
+
+    """
+    Calls a function on a copy of its arguments and describes what happened
+
+    Returns:
+    - ('return', value, arguments afterwards), or ('raise', exception type, message) where the
+      message is only kept for ValueError, the exception callers are promised
+    """
+
+    args = clone(args)
+    try:
+        value = function(*args)
+    except Exception as e:
+        return ('raise', type(e).__name__, str(e) if isinstance(e, ValueError) else None)
+
+    return ('return', value, args)
+
+def check_case(case):
+
+    """
+    Runs one case through the reference and the fast path
+
+    Parameters:
+    - case (tuple): (target name, arguments)
+
+    Returns:
+    - None if they agree, otherwise (reference outcome, fast outcome)
+    """
+
+    name, args = case
+    reference, fast, _ = TARGETS[name]
+    expected, actual = outcome(reference, args), outcome(fast, args)
+
+    return None if expected == actual else (expected, actual)
+
+def simpler_values(value):
+
+    """
+    Yields values simpler than value, simplest first, used by shrink_case()
+    """
+
+    if isinstance(value, (list, tuple)):
+        for i in range(len(value)):                 # Drop an item, then simplify one
+            yield value[:i] + value[i + 1:]
+        for i, item in enumerate(value):
+            for simpler in simpler_values(item):
+                yield value[:i] + type(value)([simpler]) + value[i + 1:]
+    elif value != '_':                              # Then replace it with an empty square or 'X'
+        yield '_'
+        if value not in ('X', 'O'):
+            yield 'X'
+
+def shrink_case(case):
+
+    """
+    Greedily simplifies a failing case, one argument part at a time, while it still fails
+
+    Parameters:
+    - case (tuple): (target name, arguments) which makes check_case() report a disagreement
+
+    Returns:
+    - case (tuple): Smallest failing case found
+    """
+
+    name, args = case
+    improved = True
+    while improved:
+        improved = False
+        for i, arg in enumerate(args):
+            for simpler in simpler_values(arg):
+                candidate = args[:i] + (simpler,) + args[i + 1:]
+                if check_case((name, candidate)):
+                    args = candidate
+                    improved = True
+                    break
+            if improved:
+                break
+
+    return name, args
+
+def fuzz_chunk(seed, count):
+
+    """
+    Worker task: checks count generated cases and shrinks the first few failures
+
+    Parameters:
+    - seed (int): Seed for this chunk's cases, so any chunk can be replayed
+    - count (int): Cases to generate
+
+    Returns:
+    - checked (int): Cases checked
+    - failures (list): (shrunk case, reference outcome, fast outcome) for up to MAX_FAILURES failures
+    """
+
+    rng = random.Random(seed)
+    names = sorted(TARGETS)
+    failures = []
+    for _ in range(count):
+        name = rng.choice(names)
+        case = (name, TARGETS[name][2](rng))
+        if check_case(case) and len(failures) < MAX_FAILURES:
+            case = shrink_case(case)
+            failures.append((case,) + check_case(case))
+
+    return count, failures
+
+def run_fuzz(cases, processes = None, seed = 0):
+
+    """
+    Checks generated cases across a process pool
+
+    Parameters:
+    - cases (int): Total cases to check
+    - processes (int): Worker processes, defaults to one per CPU
+    - seed (int): Base seed, so runs can be repeated
+
+    Returns:
+    - failures (list): Distinct (shrunk case, reference outcome, fast outcome) failures
+    - cases_per_second (float): Overall throughput
+    """
+
+    failures = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers = processes) as pool:
+        futures = [pool.submit(fuzz_chunk, seed + task, min(CHUNK_SIZE, cases - offset))
+                   for task, offset in enumerate(range(0, cases, CHUNK_SIZE))]
+        for future in futures:
+            for failure in future.result()[1]:
+                failures.setdefault(repr(failure[0]), failure)
+    elapsed = time.perf_counter() - start
+
+    return list(failures.values()), cases / elapsed if elapsed else float('inf')
+
+def format_failure(failure):
+
+    """
+    Describes a failure as a call which can be pasted into a test
+    """
+
+    (name, args), expected, actual = failure
+    return "{}({})\n  reference: {!r}\n  fast:      {!r}".format(name, ', '.join(map(repr, args)), expected, actual)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Differential fuzzing of tictactoe.py's fast paths against the reference code")
+    parser.add_argument('--cases', type = int, default = 1000000, help = "Cases to check")
+    parser.add_argument('--processes', type = int, default = None, help = "Worker processes")
+    parser.add_argument('--seed', type = int, default = 0, help = "Base random seed")
+    args = parser.parse_args()
+
+    failures, cases_per_second = run_fuzz(args.cases, args.processes, args.seed)
+    for failure in failures:
+        print(format_failure(failure))
+    print("{} cases, {} failures, {:.0f} cases/sec".format(args.cases, len(failures), cases_per_second))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,281 @@
+import os
+import struct
+import threading
+import zlib
+
+from tictactoe import apply_move, allowed_choices
+
+FRAME = struct.Struct('<II')        # Body length, CRC-32 of the body
+START = struct.Struct('<cQc')       # b'S', session id, human's symbol
+MOVE = struct.Struct('<cQBc')       # b'M', session id, square (row * 3 + col), symbol
+END = struct.Struct('<cQ')          # b'E', session id
+FSYNC_INTERVAL = 0.01               # Seconds between group commits
+
+class GameLog:
+
+    """
+    Append-only, length-prefixed log of every session's moves. Records are buffered and a
+    background thread writes and fsyncs them together every fsync_interval seconds (group commit),
+    so thousands of games share one fsync instead of paying one per move
+    """
+
+    def __init__(self, path, fsync_interval = FSYNC_INTERVAL):
+
+        """
+        Parameters:
+        - path (string): Log file, created if missing and appended to otherwise. A torn tail left
+          by a crash is cut off first, so new records follow the last complete one and can be read back
+        - fsync_interval (float): Seconds between group commits
+        """
+
+        self.file = open(path, 'ab')
+        valid_length = read_records(path)[1]
+        if valid_length != os.path.getsize(path):
+            self.file.truncate(valid_length)
+        self.fsync_interval = fsync_interval
+        self.buffer = []
+        self.appended = 0               # Records appended so far
+        self.durable = 0                # Records written and fsynced so far
+        self.closed = False
+        self.error = None               # Exception from a failed commit; the log accepts nothing after one
+        self.condition = threading.Condition()
+        self.commit_lock = threading.Lock()     # Keeps batches in order when commit() is also called directly
+        self.thread = threading.Thread(target = self.commit_loop, daemon = True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, body):
+
+        """
+        Frames a record and buffers it for the next group commit, without waiting
+
+        Parameters:
+        - body (bytes): Encoded record
+
+        Returns:
+        - sequence (int): Pass to wait() to block until this record is durable
+
+        Raises:
+        - ValueError: If the log is closed
+        - OSError: If an earlier commit failed, so nothing more can be made durable
+        """
+
+        with self.condition:
+            if self.error:
+                raise self.error
+            if self.closed:
+                raise ValueError("Game log is closed in append().")
+            self.buffer.append(FRAME.pack(len(body), zlib.crc32(body)) + body)
+            self.appended += 1
+            return self.appended
+
+    def start_game(self, session_id, first_or_second):
+
+        """
+        Logs a new session and the symbol the human plays
+
+        Raises:
+        - ValueError: If first_or_second is not 'X' or 'O' or the log is closed
+        """
+
+        if first_or_second not in allowed_choices:
+            raise ValueError("Unexpected symbol in start_game(). Must be ('X' or 'O').")
+
+        return self.append(START.pack(b'S', session_id, first_or_second.encode()))
+
+    def record_move(self, session_id, move, X_or_O):
+
+        """
+        Logs a move, given as a (row, col) tuple, played by X_or_O in a session
+        """
+
+        return self.append(MOVE.pack(b'M', session_id, move[0] * 3 + move[1], X_or_O.encode()))
+
+    def end_game(self, session_id):
+
+        """
+        Logs that a session has finished, so recover() will not rebuild it
+        """
+
+        return self.append(END.pack(b'E', session_id))
+
+    def commit(self):
+
+        """
+        Writes and fsyncs every buffered record, then wakes anyone waiting for them
+
+        Raises:
+        - OSError: If writing or fsyncing fails, or an earlier commit failed. The failed batch is
+          kept in the buffer and the error is raised again by append(), wait() and close()
+        """
+
+        with self.commit_lock:
+            with self.condition:
+                if self.error:
+                    raise self.error
+                records, self.buffer = self.buffer, []
+                sequence = self.appended
+
+            if records:
+                try:
+                    self.file.write(b''.join(records))
+                    self.file.flush()
+                    os.fsync(self.file.fileno())
+                except OSError as e:
+                    with self.condition:
+                        self.buffer = records + self.buffer
+                        self.error = e
+                        self.condition.notify_all()
+                    raise
+
+            with self.condition:
+                self.durable = max(self.durable, sequence)
+                self.condition.notify_all()
+
+    def commit_loop(self):
+
+        """
+        Background thread body: group commit every fsync_interval seconds until closed or a commit fails
+        """
+
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.closed, self.fsync_interval)
+                closed = self.closed
+            try:
+                self.commit()
+            except OSError:                 # Kept in self.error for the callers
+                return
+            if closed:
+                return
+
+    def wait(self, sequence, timeout = None):
+
+        """
+        Blocks until a record is durable
+
+        Parameters:
+        - sequence (int): Value returned when the record was appended
+        - timeout (float): Seconds to wait, or None to wait for the next commit however long it takes
+
+        Returns:
+        - Boolean value indicating if the record is durable
+
+        Raises:
+        - OSError: If a commit failed before the record was durable
+        """
+
+        with self.condition:
+            durable = self.condition.wait_for(lambda: self.durable >= sequence or self.error, timeout)
+            if self.durable >= sequence:
+                return True
+            if self.error:
+                raise self.error
+            return bool(durable)
+
+    def close(self):
+
+        """
+        Commits anything buffered, stops the background thread and closes the file
+
+        Raises:
+        - OSError: If a commit failed, so buffered records were not written
+        """
+
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify_all()
+
+        self.thread.join()
+        self.file.close()
+        if self.error:
+            raise self.error
+
+def read_records(path):
+
+    """
+    Reads every complete record from a log, stopping at a torn or corrupt tail left by a crash
+
+    Parameters:
+    - path (string): Log file
+
+    Returns:
+    - records (list): Record bodies in the order they were appended
+    - valid_length (int): Bytes of the file holding complete records
+    """
+
+    with open(path, 'rb') as log_file:
+        data = log_file.read()
+
+    records = []
+    offset = 0
+    while offset + FRAME.size <= len(data):
+        length, checksum = FRAME.unpack_from(data, offset)
+        body = data[offset + FRAME.size:offset + FRAME.size + length]
+        if len(body) != length or zlib.crc32(body) != checksum:
+            break
+        records.append(body)
+        offset += FRAME.size + length
+
+    return records, offset
+
+def recover(path):
+
+    """
+    Replays a log to rebuild the sessions which had not finished, and cuts off any torn tail
+    so new records are appended after the last complete one. A session with a move which cannot
+    be replayed is corrupt and is left out, so the other sessions still recover, and a session
+    whose last move won or filled the board has finished even if its end record was lost
+
+    Parameters:
+    - path (string): Log file
+
+    Returns:
+    - sessions (dict): Session id -> {'first_or_second': human's symbol, 'board_state': rebuilt board,
+      'X_or_O': symbol to move next} for every session without an end record
+
+    Raises:
+    - ValueError: If a complete record is not a log record
+    """
+
+    if not os.path.exists(path):
+        return {}
+
+    records, valid_length = read_records(path)
+    if valid_length != os.path.getsize(path):
+        with open(path, 'r+b') as log_file:
+            log_file.truncate(valid_length)
+
+    sessions = {}
+    for body in records:
+        kind = body[:1]
+        if kind == b'S':
+            _, session_id, first_or_second = START.unpack(body)
+            sessions[session_id] = {'first_or_second': first_or_second.decode(),
+                                    'board_state': [['_'] * 3 for _ in range(3)], 'X_or_O': 'X'}
+        elif kind == b'M':
+            _, session_id, square, symbol = MOVE.unpack(body)
+            if session_id in sessions:
+                session = sessions[session_id]
+                try:
+                    outcome = apply_move(session['board_state'], divmod(square, 3), symbol.decode())
+                except ValueError:                          # Corrupt session: drop it and ignore its later moves
+                    del sessions[session_id]
+                    continue
+                if outcome != 'continue':                   # Won or drawn, the end record was lost in the crash
+                    del sessions[session_id]
+                    continue
+                session['X_or_O'] = 'O' if symbol == b'X' else 'X'
+        elif kind == b'E':
+            sessions.pop(END.unpack(body)[1], None)
+        else:
+            raise ValueError("Unexpected record in game log in recover().")
+
+    return sessions
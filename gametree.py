@@ -0,0 +1,157 @@
+from tictactoe import WIN_LINES, switch_turn
+from solver import flatten_board, winner
+
+LINES_THROUGH = tuple(tuple(line for line in WIN_LINES if square in line) for square in range(9))   # Lines through each square
+MOVES = tuple(divmod(square, 3) for square in range(9))                                                 # (row, col) of each square
+
+def completed_lines(cells, square, X_or_O):
+
+    """
+    Returns the lines through a square which are all X_or_O on a flattened board
+
+    Parameters:
+    - cells (list): The nine squares in row order
+    - square (int): Index of the square just played
+    - X_or_O (string): This is the symbol which was played
+
+    Returns:
+    - lines (list): Index triples of every completed line through the square
+    """
+
+    return [line for line in LINES_THROUGH[square] if all(cells[i] == X_or_O for i in line)]
+
+def wins_at(cells, square, X_or_O):
+
+    """
+    Checks whether the stone on a square completes any line for X_or_O on a flattened board
+
+    Parameters:
+    - cells (list): The nine squares in row order
+    - square (int): Index of the square just played
+    - X_or_O (string): This is the symbol which was played
+
+    Returns:
+    - Boolean value indicating if any line through the square is all X_or_O
+    """
+
+    for a, b, c in LINES_THROUGH[square]:
+        if cells[a] == cells[b] == cells[c] == X_or_O:
+            return True
+
+    return False
+
+def iter_games(board_state, X_or_O = 'X'):
+
+    """
+    Lazily yields every legal game which can be played out from a position.
+    Games stop at three in a row or a full board. Moves are made and undone on a single
+    flat board, so memory does not grow with the number of games yielded
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+    - X_or_O (string): This is the symbol of the player to move
+
+    Yields:
+    - game (tuple): (row, col) moves in the order played. A position which is already
+      over yields a single empty game
+
+    Raises:
+    - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols
+    """
+
+    cells = list(flatten_board(board_state))
+    symbols = (X_or_O, switch_turn(X_or_O))
+    if winner(cells) or '_' not in cells:
+        yield ()
+        return
+
+    path = []
+    stack = [iter([i for i in range(9) if cells[i] == '_'])]
+    while stack:
+        square = next(stack[-1], None)
+        if square is None:                                  # All moves from this position tried
+            stack.pop()
+            if path:
+                cells[path.pop()] = '_'
+            continue
+
+        symbol = symbols[len(path) % 2]
+        cells[square] = symbol
+        path.append(square)
+        if wins_at(cells, square, symbol) or '_' not in cells:
+            yield tuple(MOVES[i] for i in path)
+            cells[path.pop()] = '_'
+        else:
+            stack.append(iter([i for i in range(9) if cells[i] == '_']))
+
+def is_canonical_child(cells, square, symbol, fixed):
+
+    """
+    Checks whether a position was reached from its canonical parent. The canonical parent
+    removes the lowest-indexed stone of the last mover which leaves a game still in progress,
+    so every position has exactly one and can be visited once without remembering it
+
+    Parameters:
+    - cells (list): The nine squares in row order, after the move
+    - square (int): Index of the square just played
+    - symbol (string): This is the symbol which was played
+    - fixed (set): Squares occupied in the starting position, which can never be removed
+
+    Returns:
+    - Boolean value indicating if removing square gives the canonical parent
+    """
+
+    lines = completed_lines(cells, square, symbol)
+    for i in range(square):
+        if cells[i] == symbol and i not in fixed and all(i in line for line in lines):
+            return False                                    # Removing i also leaves a game in progress
+
+    return True
+
+def iter_positions(board_state, X_or_O = 'X'):
+
+    """
+    Lazily yields every unique position reachable from a position, each exactly once.
+    Transpositions are skipped with is_canonical_child() rather than a set of seen positions,
+    so memory does not grow with the number of positions yielded
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+    - X_or_O (string): This is the symbol of the player to move
+
+    Yields:
+    - cells (string): The nine squares in row order, starting with the given position
+
+    Raises:
+    - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols
+    """
+
+    cells = list(flatten_board(board_state))
+    symbols = (X_or_O, switch_turn(X_or_O))
+    fixed = {i for i in range(9) if cells[i] != '_'}
+    yield ''.join(cells)
+    if winner(cells) or '_' not in cells:
+        return
+
+    path = []
+    stack = [iter([i for i in range(9) if cells[i] == '_'])]
+    while stack:
+        square = next(stack[-1], None)
+        if square is None:                                  # All moves from this position tried
+            stack.pop()
+            if path:
+                cells[path.pop()] = '_'
+            continue
+
+        symbol = symbols[len(path) % 2]
+        cells[square] = symbol
+        if not is_canonical_child(cells, square, symbol, fixed):
+            cells[square] = '_'
+            continue
+
+        yield ''.join(cells)
+        if wins_at(cells, square, symbol) or '_' not in cells:
+            cells[square] = '_'
+        else:
+            path.append(square)
+            stack.append(iter([i for i in range(9) if cells[i] == '_']))
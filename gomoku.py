@@ -0,0 +1,353 @@
+import random
+
+from tictactoe import allowed_symbols, switch_turn
+
+GOMOKU_SIZE = 15                                # Board width and height
+GOMOKU_K = 5                                    # Stones in a row needed to win
+NEIGHBOURHOOD = 2                               # Moves are only generated this close to existing stones
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))  # Row, column, diagonal and anti-diagonal
+MAX_NODES = 5000                                # Threat-space search gives up after this many positions
+WINDOW_BASE = 8                                 # A live window with n stones adds WINDOW_BASE ** n to a quiet move's score
+
+class GomokuBoard:
+
+    """
+    Square board for k-in-a-row games. Every line of k squares (a window) keeps a count of each
+    symbol's stones, updated incrementally as moves are played and undone, so threats are found
+    from the live windows (some of one symbol's stones and none of the other's) without rescanning
+    the board. Squares are flat indexes, row * size + col
+    """
+
+    def __init__(self, size = GOMOKU_SIZE, k = GOMOKU_K):
+
+        """
+        Parameters:
+        - size (int): Board width and height
+        - k (int): Stones in a row needed to win
+
+        Raises:
+        - ValueError: If k is less than 2 or larger than size
+        """
+
+        if not 2 <= k <= size:
+            raise ValueError("Invalid gomoku board. Need 2 <= k <= size.")
+
+        self.size = size
+        self.k = k
+        self.cells = ['_'] * (size * size)
+        self.windows = []
+        for row in range(size):
+            for col in range(size):
+                for d_row, d_col in DIRECTIONS:
+                    if 0 <= row + d_row * (k - 1) < size and 0 <= col + d_col * (k - 1) < size:
+                        self.windows.append(tuple((row + d_row * i) * size + col + d_col * i for i in range(k)))
+
+        self.windows_of = [[] for _ in range(size * size)]
+        for window, squares in enumerate(self.windows):
+            for square in squares:
+                self.windows_of[square].append(window)
+
+        self.around = [[r * size + c
+                        for r in range(max(0, row - NEIGHBOURHOOD), min(size, row + NEIGHBOURHOOD + 1))
+                        for c in range(max(0, col - NEIGHBOURHOOD), min(size, col + NEIGHBOURHOOD + 1))
+                        if (r, c) != (row, col)]
+                       for row in range(size) for col in range(size)]
+
+        self.counts = {symbol: [0] * len(self.windows) for symbol in ('X', 'O')}
+        self.live = {symbol: [set() for _ in range(k + 1)] for symbol in ('X', 'O')}   # live[symbol][n]: windows with n of symbol's stones and none of the other's
+        self.stones = 0
+        zobrist_random = random.Random(size * 1000 + k)                               # Fixed seed, so hashes are repeatable
+        self.zobrist = {symbol: [zobrist_random.getrandbits(64) for _ in range(size * size)] for symbol in ('X', 'O')}
+        self.hash = 0
+
+    @classmethod
+    def from_rows(cls, rows, k = GOMOKU_K):
+
+        """
+        Builds a board from rows of '_', 'X' and 'O', eg ['__X', '_O_', '___']
+
+        Raises:
+        - ValueError: If the rows do not make a square or have unexpected symbols
+        """
+
+        if any(len(row) != len(rows) for row in rows):
+            raise ValueError("Invalid gomoku board. Rows must make a square.")
+
+        board = cls(len(rows), k)
+        for row, symbols in enumerate(rows):
+            for col, symbol in enumerate(symbols):
+                if symbol not in allowed_symbols:
+                    raise ValueError("Unexpected symbols in rows in from_rows(). Must be ('_', 'X' or 'O').")
+                if symbol != '_':
+                    board.play(row * board.size + col, symbol)
+
+        return board
+
+    def play(self, square, X_or_O):
+
+        """
+        Places a stone and updates the window counts
+
+        Raises:
+        - ValueError: If the square is not empty
+        """
+
+        if self.cells[square] != '_':
+            raise ValueError("That is not an available square in play().")
+
+        other = 'O' if X_or_O == 'X' else 'X'
+        mine, theirs = self.counts[X_or_O], self.counts[other]
+        live_mine, live_theirs = self.live[X_or_O], self.live[other]
+        self.cells[square] = X_or_O
+        for window in self.windows_of[square]:
+            count, their_count = mine[window], theirs[window]
+            if not their_count:
+                live_mine[count].discard(window)
+                live_mine[count + 1].add(window)
+            elif not count:                                 # Window is no longer live for the other symbol
+                live_theirs[their_count].discard(window)
+            mine[window] = count + 1
+
+        self.stones += 1
+        self.hash ^= self.zobrist[X_or_O][square]
+
+    def undo(self, square):
+
+        """
+        Removes the stone on a square, reversing play()
+        """
+
+        X_or_O = self.cells[square]
+        other = 'O' if X_or_O == 'X' else 'X'
+        mine, theirs = self.counts[X_or_O], self.counts[other]
+        live_mine, live_theirs = self.live[X_or_O], self.live[other]
+        self.cells[square] = '_'
+        for window in self.windows_of[square]:
+            count, their_count = mine[window] - 1, theirs[window]
+            mine[window] = count
+            if not their_count:
+                live_mine[count + 1].discard(window)
+                if count:
+                    live_mine[count].add(window)
+            elif not count:                                 # Window is live for the other symbol again
+                live_theirs[their_count].add(window)
+
+        self.stones -= 1
+        self.hash ^= self.zobrist[X_or_O][square]
+
+    def winner(self):
+
+        """
+        Returns 'X' or 'O' if that symbol has k in a row, otherwise None
+        """
+
+        for symbol in ('X', 'O'):
+            if self.live[symbol][self.k]:
+                return symbol
+
+        return None
+
+    def empties(self, X_or_O, count):
+
+        """
+        Returns the empty squares of every live window holding count of X_or_O's stones
+        """
+
+        cells = self.cells
+        return {square for window in self.live[X_or_O][count] for square in self.windows[window] if cells[square] == '_'}
+
+    def winning_squares(self, X_or_O):
+
+        """
+        Returns the squares where X_or_O would complete k in a row
+        """
+
+        return self.empties(X_or_O, self.k - 1)
+
+    def candidate_moves(self):
+
+        """
+        Returns the empty squares near existing stones, or the centre of an empty board
+        """
+
+        if not self.stones:
+            return [(self.size // 2) * self.size + self.size // 2]
+
+        cells = self.cells
+        return sorted({neighbour for square, cell in enumerate(cells) if cell != '_'
+                       for neighbour in self.around[square] if cells[neighbour] == '_'})
+
+def find_forced_win(board, attacker, max_depth = 10, max_threes = 3, max_nodes = MAX_NODES):
+
+    """
+    Threat-space search for a forced win. The attacker only plays threats: fours, which leave the
+    defender one reply, and open threes, which threaten to make two fours at once. Against a three
+    the defender is only given the replies which stop every double four, plus counter-fours, since
+    any other move loses at once. Depths are searched shortest first and positions are cached by
+    Zobrist hash. The board is restored before returning
+
+    Parameters:
+    - board (GomokuBoard): Position to search, with attacker to move
+    - attacker (string): This is the symbol looking for a win
+    - max_depth (int): Most attacker moves in the winning sequence
+    - max_threes (int): Most of those moves which may be threes rather than fours (0 for fours only)
+    - max_nodes (int): Positions to search before giving up
+
+    Returns:
+    - line (list): (row, col) moves, alternating the attacker's threats with the first defence tried
+      against each, or None if no forced win was found within the limits
+    """
+
+    defender = switch_turn(attacker)
+    k = board.k
+    cache = {}
+    nodes = [0]
+
+    def attack(depth, threes):
+        nodes[0] += 1
+        wins = board.winning_squares(attacker)
+        if wins:
+            return [min(wins)]
+        threats = board.winning_squares(defender)
+        if depth == 0 or len(threats) > 1 or nodes[0] > max_nodes:
+            return None
+
+        key = (board.hash, depth, threes)
+        if key in cache:
+            return cache[key]
+
+        if threats:                                         # Must block, and the block must itself threaten
+            moves = sorted(threats)
+        else:
+            fours = board.empties(attacker, k - 2)
+            moves = sorted(fours) + (sorted(board.empties(attacker, k - 3) - fours) if threes else [])
+
+        line = None
+        for move in moves:
+            board.play(move, attacker)
+            reply = defend(move, bool(threats), depth, threes)
+            board.undo(move)
+            if reply is not None:
+                line = [move] + reply
+                break
+
+        cache[key] = line
+        return line
+
+    def defend(move, forced, depth, threes):
+        if board.winning_squares(defender):                 # Defender wins before the threat matters
+            return None
+        wins = board.winning_squares(attacker)
+        if len(wins) > 1:
+            return []
+        if wins:                                            # Four: only one reply
+            defences = wins
+        else:                                               # Three: stop every double four, or counter with a four
+            if not threes:
+                return None
+            threes -= 1
+            if forced:                                      # A block may leave an older double four standing
+                squares = double_fours(board.empties(attacker, k - 2))
+            else:                                           # Fours are tried first, so any double four goes through move
+                squares = double_fours(near_squares(move))
+            if not squares:
+                return None
+            defences = set(board.empties(defender, k - 2))
+            for square in near_squares(*squares) | squares:
+                board.play(square, defender)
+                if not double_fours(squares):
+                    defences.add(square)
+                board.undo(square)
+            if not defences:                                # Two threes at once: nothing stops them both
+                return []
+
+        first = None
+        for defence in sorted(defences):
+            board.play(defence, defender)
+            line = attack(depth - 1, threes)
+            board.undo(defence)
+            if line is None:
+                return None
+            if first is None:
+                first = [defence] + line
+
+        return first
+
+    def near_squares(*squares):
+        live, cells, windows = board.live[attacker][k - 2], board.cells, board.windows
+        return {other for square in squares for window in board.windows_of[square]
+                if window in live
+                for other in windows[window] if cells[other] == '_'}
+
+    def double_fours(squares):
+        found = set()
+        for square in squares:
+            if board.cells[square] != '_':
+                continue
+            nodes[0] += 1
+            board.play(square, attacker)
+            if len(board.winning_squares(attacker)) > 1:
+                found.add(square)
+            board.undo(square)
+
+        return found
+
+    for depth in range(1, max_depth + 1):                   # Shortest wins first
+        line = attack(depth, max_threes)
+        if line:
+            return [divmod(square, board.size) for square in line]
+        if nodes[0] > max_nodes:
+            break
+
+    return None
+
+def choose_gomoku_move(board, X_or_O, max_depth = 10):
+
+    """
+    Chooses a move: win, block a win, play a forced win from find_forced_win(), stop the
+    opponent's continuous fours, otherwise the nearby square on the most promising windows
+
+    Parameters:
+    - board (GomokuBoard): Position with X_or_O to move
+    - X_or_O (string): This is the symbol to move
+    - max_depth (int): Most attacker moves searched by find_forced_win()
+
+    Returns:
+    - (row, col) tuple of the chosen move, or None if the board is full
+
+    Raises:
+    - ValueError: If X_or_O is not 'X' or 'O'
+    """
+
+    if X_or_O not in ('X', 'O'):
+        raise ValueError("Unexpected symbol in choose_gomoku_move(). Must be ('X' or 'O').")
+
+    other = switch_turn(X_or_O)
+    for squares in (board.winning_squares(X_or_O), board.winning_squares(other)):
+        if squares:
+            return divmod(min(squares), board.size)
+
+    line = find_forced_win(board, X_or_O, max_depth)
+    if line:
+        return line[0]
+
+    moves = board.candidate_moves()
+    if not moves:
+        return None
+
+    their_win = find_forced_win(board, other, max_depth, max_threes = 0)
+    if their_win:                                           # Take the square their continuous fours start from
+        return their_win[0]
+
+    counts = board.counts
+    def score(square):
+        total = 0
+        for window in board.windows_of[square]:
+            mine, theirs = counts[X_or_O][window], counts[other][window]
+            if not theirs:
+                total += WINDOW_BASE ** (mine + 1)
+            if not mine:
+                total += WINDOW_BASE ** (theirs + 1) // 2
+        return total
+
+    return divmod(max(moves, key = score), board.size)
@@ -0,0 +1,173 @@
+import argparse
+import mmap
+import struct
+
+from tictactoe import SYMBOL_DIGITS, allowed_symbols, switch_turn
+from solver import best_moves, flatten_board, winner
+
+BOOK_MAGIC = b'TTTB'                        # Identifies opening book files
+BOOK_VERSION = 1
+HEADER = struct.Struct('<4sBBHI')           # Magic, version, board size, plies, record count
+RECORD = struct.Struct('<QB')               # Position key, chosen square (row * size + col)
+
+def position_key(board_state):
+
+    """
+    Encodes a square board of any size as a base-3 integer, used to look positions up in the book.
+    Boards up to 6x6 fit in the 64-bit key stored in the book
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+
+    Returns:
+    - key (int): Sum of each square's digit ('_' 0, 'X' 1, 'O' 2) times 3 ** square index
+
+    Raises:
+    - ValueError: If board_state has unexpected symbols
+    """
+
+    key = 0
+    power = 1
+    for row in board_state:
+        for cell in row:
+            if cell not in allowed_symbols:
+                raise ValueError("Unexpected symbols in board_state in position_key(). Must be ('_', 'X' or 'O').")
+            key += SYMBOL_DIGITS[cell] * power
+            power *= 3
+
+    return key
+
+def build_book(plies):
+
+    """
+    Searches every position reachable in the first plies of the game and records the
+    perfect-play move for the player to move, preferring centre, corners, then sides
+
+    Parameters:
+    - plies (int): How many plies from the empty board to cover
+
+    Returns:
+    - entries (list): Sorted (position key, square) pairs, one per non-terminal position
+    """
+
+    entries = {}
+    frontier = [[['_'] * 3 for _ in range(3)]]
+    X_or_O = 'X'                                            # X is always first
+    for _ in range(plies):
+        next_frontier = []
+        for board_state in frontier:
+            key = position_key(board_state)
+            if key in entries or winner(flatten_board(board_state)):
+                continue
+            moves = best_moves(board_state, X_or_O)
+            if not moves:                                   # Board is full
+                continue
+            entries[key] = moves[0][0] * 3 + moves[0][1]
+            for row, col in ([r, c] for r in range(3) for c in range(3) if board_state[r][c] == '_'):
+                child = [list(r) for r in board_state]
+                child[row][col] = X_or_O
+                next_frontier.append(child)
+        frontier = next_frontier
+        X_or_O = switch_turn(X_or_O)
+
+    return sorted(entries.items())
+
+def write_book(path, entries, plies, board_size = 3):
+
+    """
+    Writes sorted book entries to a compact binary file
+
+    Parameters:
+    - path (string): Destination file
+    - entries (list): Sorted (position key, square) pairs from build_book()
+    - plies (int): How many plies the book covers, stored in the header
+    - board_size (int): Width of the board the book was built for
+
+    Returns:
+    - None
+    """
+
+    with open(path, 'wb') as book_file:
+        book_file.write(HEADER.pack(BOOK_MAGIC, BOOK_VERSION, board_size, plies, len(entries)))
+        for key, square in entries:
+            book_file.write(RECORD.pack(key, square))
+
+class OpeningBook:
+
+    """
+    Memory-mapped opening book. Positions are found by binary search on their key,
+    so a lookup reads a handful of records and never starts a search
+    """
+
+    def __init__(self, path):
+
+        """
+        Parameters:
+        - path (string): Book file written by write_book()
+
+        Raises:
+        - ValueError: If the file is not an opening book or is truncated
+        """
+
+        with open(path, 'rb') as book_file:
+            self.data = mmap.mmap(book_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        if len(self.data) < HEADER.size:
+            self.data.close()
+            raise ValueError("Invalid opening book. File is too short.")
+
+        magic, version, self.board_size, self.plies, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION or len(self.data) != HEADER.size + self.count * RECORD.size:
+            self.data.close()
+            raise ValueError("Invalid opening book. Unexpected header or length.")
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.data.close()
+
+    def probe(self, board_state):
+
+        """
+        Looks up the book move for a position
+
+        Parameters:
+        - board_state (list): 2D array which tracks empty squares and squares with symbols
+
+        Returns:
+        - (row, col) tuple of the book move, or None if the position is not in the book
+        """
+
+        if len(board_state) != self.board_size:
+            return None
+
+        key = position_key(board_state)
+        low, high = 0, self.count
+        while low < high:                                       # Binary search over fixed-size records
+            mid = (low + high) // 2
+            mid_key, square = RECORD.unpack_from(self.data, HEADER.size + mid * RECORD.size)
+            if mid_key < key:
+                low = mid + 1
+            elif mid_key > key:
+                high = mid
+            else:
+                return divmod(square, self.board_size)
+
+        return None
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Build an opening book from the perfect-play solver")
+    parser.add_argument('path', help = "Book file to write")
+    parser.add_argument('--plies', type = int, default = 4, help = "Number of opening plies to cover")
+    args = parser.parse_args()
+
+    entries = build_book(args.plies)
+    write_book(args.path, entries, args.plies)
+    print("Wrote {} positions to {}".format(len(entries), args.path))
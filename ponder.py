@@ -0,0 +1,141 @@
+import random
+import threading
+
+from tictactoe import choose_move, position_index, position_tables, use_random, LEGAL_MOVE_LISTS
+from tracing import tracer
+
+class Ponderer:
+
+    """
+    Works out the computer's reply to every human move in a background thread while the
+    human is thinking. The terminal game blocks in input() during that time, which releases
+    the interpreter lock, so the replies are computed for free and the computer's turn
+    becomes a cache lookup.
+    The engine's corner and side choices come from a generator seeded per position from the
+    ponderer's own random.Random, so a reply is the same whether it was pondered or not, and
+    the random module's state, which --seed repeats, is never touched from the thread
+    """
+
+    def __init__(self, engine = choose_move, seed = None):
+
+        """
+        Parameters:
+        - engine (function): Takes (board_state, X_or_O) and returns the (row, col) to play
+        - seed (int): Seed for the engine's random choices, or None for a different game each run
+        """
+
+        self.engine = engine
+        self.rng = random.Random(seed)
+        self.salt = self.rng.getrandbits(64)
+        self.cache = {}                     # (position index, computer's symbol) -> reply
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, board_state, human, computer):
+
+        """
+        Starts pondering the replies to every legal human move, replacing any earlier pondering
+
+        Parameters:
+        - board_state (list): 2D array which tracks empty squares and squares with symbols
+        - human (string): This is the symbol the human is about to play
+        - computer (string): This is the symbol the computer replies with
+
+        Returns:
+        - None
+
+        Raises:
+        - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols
+        """
+
+        legal = position_tables()[1][position_index(board_state)]
+        self.stop()
+        with self.lock:
+            self.cache.clear()
+
+        self.stop_event = threading.Event()
+        snapshot = [list(row) for row in board_state]       # The game keeps using its own board
+        self.thread = threading.Thread(target = self.ponder,
+                                       args = (snapshot, LEGAL_MOVE_LISTS[legal], human, computer, self.stop_event),
+                                       daemon = True)
+        self.thread.start()
+
+    def ponder(self, board_state, human_moves, human, computer, stop_event):
+
+        """
+        Background thread body: plays each human move on a private board and caches the engine's reply.
+        Tracing is suppressed, as these are guesses; reply() records the move actually played
+        """
+
+        _, _, terminal = position_tables()
+        for row, col in human_moves:
+            if stop_event.is_set():
+                return
+            board_state[row][col] = human
+            index = position_index(board_state)
+            if not terminal[index]:
+                with tracer.suppressed(), use_random(self.position_random(index, computer)):
+                    reply = self.engine(board_state, computer)
+                with self.lock:
+                    self.cache[index, computer] = reply
+            board_state[row][col] = '_'
+
+    def position_random(self, index, computer):
+
+        """
+        Generator for the engine's choices in one position, the same for every call with that position
+        """
+
+        return random.Random('{} {} {}'.format(self.salt, index, computer))
+
+    def wait(self, timeout = None):
+
+        """
+        Blocks until the current pondering has finished or timeout seconds have passed
+        """
+
+        if self.thread:
+            self.thread.join(timeout)
+
+    def stop(self):
+
+        """
+        Asks the pondering thread to finish after the reply it is working on
+        """
+
+        self.stop_event.set()
+
+    def reply(self, board_state, X_or_O):
+
+        """
+        Returns the computer's move, from the cache if it was pondered and from the engine otherwise
+
+        Parameters:
+        - board_state (list): 2D array which tracks empty squares and squares with symbols
+        - X_or_O (string): This is the symbol which the computer is playing
+
+        Returns:
+        - (row, col) tuple of the chosen move
+
+        Raises:
+        - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols
+        """
+
+        self.stop()
+        index = position_index(board_state)
+        with self.lock:
+            move = self.cache.get((index, X_or_O))
+
+        if move is None:
+            self.misses += 1
+            with use_random(self.position_random(index, X_or_O)):
+                return tuple(self.engine(board_state, X_or_O))
+
+        self.hits += 1
+        if tracer.enabled:
+            tracer.record('move', symbol = X_or_O, move = move, source = 'ponder')
+
+        return tuple(move)
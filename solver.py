@@ -0,0 +1,161 @@
+import functools
+
+from tictactoe import WIN_LINES, collect_legal_moves, correct_board_state, switch_turn
+
+MAX_SCORE = 10                                  # A win in d plies scores MAX_SCORE - d, so faster wins score higher
+MOVE_PREFERENCE = (4, 0, 2, 6, 8, 1, 3, 5, 7)   # Centre, corners, then sides; breaks ties between equal moves
+
+def flatten_board(board_state):
+
+    """
+    Flattens a board_state into a 9-character string so it can be hashed and cached
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+
+    Returns:
+    - cells (string): The nine squares in row order, eg 'X___O____'
+
+    Raises:
+    - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols
+    """
+
+    # Ensure board_state is 3x3 matrix with valid symbols
+    correct_board_state(board_state)
+
+    return ''.join(cell for row in board_state for cell in row)
+
+def winner(cells):
+
+    """
+    Returns the symbol with three in a row on a flattened board, if any
+
+    Parameters:
+    - cells (string): The nine squares in row order
+
+    Returns:
+    - 'X', 'O' or None if neither symbol has three in a row
+    """
+
+    for a, b, c in WIN_LINES:
+        if cells[a] != '_' and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+
+    return None
+
+@functools.lru_cache(maxsize = None)
+def solve(cells, X_or_O):
+
+    """
+    Negamax value of a flattened board for the player to move under perfect play.
+    Results are cached, so the full game is only ever searched once per process
+
+    Parameters:
+    - cells (string): The nine squares in row order
+    - X_or_O (string): This is the symbol of the player to move
+
+    Returns:
+    - score (int): MAX_SCORE - d if the player to move wins in d plies,
+      -(MAX_SCORE - d) if they lose in d plies and 0 for a draw
+    """
+
+    won = winner(cells)
+    if won:                                     # Game already over, so nothing left to search
+        return MAX_SCORE if won == X_or_O else -MAX_SCORE
+    if '_' not in cells:
+        return 0
+
+    other = switch_turn(X_or_O)
+    best = -MAX_SCORE
+    for i, cell in enumerate(cells):
+        if cell == '_':
+            best = max(best, move_score(solve(cells[:i] + X_or_O + cells[i + 1:], other)))
+
+    return best
+
+def move_score(child_score):
+
+    """
+    Converts the score of the position after a move (from the opponent's view)
+    into the score of that move for the player who made it
+
+    Parameters:
+    - child_score (int): Score returned by solve() for the resulting position
+
+    Returns:
+    - score (int): Score of the move, one ply further from the end of the game
+    """
+
+    if child_score > 0:
+        return -(child_score - 1)
+    if child_score < 0:
+        return -(child_score + 1)
+    return 0
+
+def score_to_distance(score):
+
+    """
+    Returns the number of plies until the game is decided for a solve() score
+
+    Parameters:
+    - score (int): Score returned by solve() or move_score()
+
+    Returns:
+    - Number of plies until the win or loss, or None for a drawn position
+    """
+
+    return MAX_SCORE - abs(score) if score else None
+
+def analyse(board_state, X_or_O):
+
+    """
+    Scores every legal move under perfect play, for hints and coaching. All moves share the
+    cached solve() results, so positions reached by several moves are only searched once
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+    - X_or_O (string): This is the symbol of the player to move
+
+    Returns:
+    - analysis (list): One dictionary per move from collect_legal_moves(), best first, with keys
+      move ((row, col) tuple), value ('win', 'draw' or 'loss'), distance (plies until the game is
+      decided, None for a draw) and score (move_score() of the move).
+      Ties keep MOVE_PREFERENCE order. Empty if the game is over
+
+    Raises:
+    - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols
+    """
+
+    cells = flatten_board(board_state)
+    if winner(cells):
+        return []
+
+    other = switch_turn(X_or_O)
+    analysis = []
+    for row, col in collect_legal_moves(board_state):
+        square = row * 3 + col
+        score = move_score(solve(cells[:square] + X_or_O + cells[square + 1:], other))
+        analysis.append({'move': (row, col), 'value': 'win' if score > 0 else 'loss' if score < 0 else 'draw',
+                         'distance': score_to_distance(score), 'score': score})
+
+    analysis.sort(key = lambda line: (-line['score'], MOVE_PREFERENCE.index(line['move'][0] * 3 + line['move'][1])))
+    return analysis
+
+def best_moves(board_state, X_or_O):
+
+    """
+    Finds every move which keeps the perfect-play value of the position
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+    - X_or_O (string): This is the symbol of the player to move
+
+    Returns:
+    - moves (list): [row, col] pairs in MOVE_PREFERENCE order, empty if the game is over
+
+    Raises:
+    - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols
+    """
+
+    analysis = analyse(board_state, X_or_O)
+    return [list(line['move']) for line in analysis if line['score'] == analysis[0]['score']]
@@ -0,0 +1,95 @@
+import io
+import os
+import unittest
+
+from audit import (
+    classify,
+    audit,
+    format_finding,
+    read_baseline,
+    write_baseline,
+    compare_baseline,
+)
+from tictactoe import build_pipeline, win_stage, block_stage
+from solver import best_moves
+
+def perfect_stage(board_state, legal_moves, X_or_O):
+    return best_moves(board_state, X_or_O)[0]
+
+class TestClassify(unittest.TestCase):
+
+    """
+    Test cases for classify function
+    """
+
+    def test_classify(self):
+        # Won position drawn or lost, drawn position lost, and slower wins
+        self.assertEqual(classify(7, 0), 'win')
+        self.assertEqual(classify(7, -4), 'win')
+        self.assertEqual(classify(0, -6), 'draw')
+        self.assertIsNone(classify(9, 5))
+        self.assertIsNone(classify(0, 0))
+
+class TestAudit(unittest.TestCase):
+
+    """
+    Test cases for audit function
+    """
+
+    def test_audit_heuristic(self):
+        # The game's computer gives away wins as 'X' and draws as 'O'
+        findings, positions = audit()
+        self.assertGreater(positions, 0)
+        self.assertTrue(findings)
+        self.assertTrue(all(finding['gives_away'] == ('win' if finding['computer'] == 'X' else 'draw')
+                            for finding in findings))
+
+    def test_audit_covers_random_choices(self):
+        # Both corners the heuristic could pick against opposite corners are reported
+        findings, _ = audit()
+        moves = {finding['move'] for finding in findings if finding['cells'] == 'X___O___X'}
+        self.assertEqual(moves, {(0, 2), (2, 0)})
+
+    def test_audit_perfect_strategy(self):
+        # Perfect play has no findings
+        findings, _ = audit(build_pipeline([perfect_stage]))
+        self.assertEqual(findings, [])
+
+    def test_audit_win_and_block_only(self):
+        # Win and block ahead of perfect play keep every result
+        findings, _ = audit(build_pipeline([win_stage, block_stage, perfect_stage]))
+        self.assertEqual(findings, [])
+
+    def test_format_finding(self):
+        # One readable line per finding
+        finding = {'cells': 'X___O___X', 'computer': 'O', 'move': (0, 2),
+                   'gives_away': 'draw', 'best_score': 0, 'score': -6}
+        self.assertEqual(format_finding(finding),
+                         "O to move X___O___X: plays (0, 2), gives away draw (best 0, got -6)")
+
+class TestBaseline(unittest.TestCase):
+
+    """
+    Test cases for read_baseline, write_baseline and compare_baseline functions
+    """
+
+    def test_recorded_findings_pass(self):
+        # Findings written to the baseline are not new, and the recorded file matches them
+        findings, _ = audit()
+        baseline_file = io.StringIO()
+        write_baseline(baseline_file, findings)
+        baseline_file.seek(0)
+        self.assertEqual(compare_baseline(findings, read_baseline(baseline_file)), ([], []))
+        with open(os.path.join(os.path.dirname(__file__), 'audit_baseline.txt')) as recorded:
+            self.assertEqual(compare_baseline(findings, read_baseline(recorded)), ([], []))
+
+    def test_new_and_fixed(self):
+        # A finding missing from the baseline is new, a baseline line no longer found is fixed
+        findings, _ = audit()
+        baseline = {format_finding(finding) for finding in findings[1:]} | {'X to move _________: gone'}
+        new, fixed = compare_baseline(findings, baseline)
+        self.assertEqual(new, findings[:1])
+        self.assertEqual(fixed, ['X to move _________: gone'])
+
+if __name__ == '__main__':
+    unittest.main()
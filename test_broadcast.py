@@ -0,0 +1,112 @@
+import unittest
+
+from broadcast import Broadcaster, decode_message
+
+class TestBroadcaster(unittest.IsolatedAsyncioTestCase):
+
+    """
+    Test cases for Broadcaster class
+    """
+
+    async def read_all(self, subscription):
+        # Read every message until the spectator's stream ends
+        return [decode_message(message) async for message in subscription]
+
+    async def test_spectator_sees_snapshot_moves_and_end(self):
+        # Snapshot first, then one diff per move and the result
+        game = Broadcaster()
+        spectator = game.subscribe()
+        game.play((1, 1), 'X')
+        game.play((0, 0), 'O')
+        game.play((0, 2), 'X')
+        game.play((2, 2), 'O')
+        self.assertEqual(game.play((2, 0), 'X'), 'win')
+        messages = await self.read_all(spectator)
+        self.assertEqual(messages[0], ('snapshot', 0, '_' * 9))
+        self.assertEqual(messages[1], ('move', 1, (1, 1), 'X'))
+        self.assertEqual(messages[-1], ('end', 6, 'X'))
+        self.assertEqual(len(messages), 7)
+
+    async def test_move_encoded_once(self):
+        # Every spectator is sent the same bytes object
+        game = Broadcaster()
+        spectators = [game.subscribe() for _ in range(3)]
+        game.play((0, 0), 'X')
+        for spectator in spectators:
+            await spectator.__anext__()                     # Snapshot
+        messages = [await spectator.__anext__() for spectator in spectators]
+        self.assertTrue(all(message is messages[0] for message in messages))
+
+    async def test_slow_spectator_resynced(self):
+        # A full queue is replaced by a snapshot which includes the latest move
+        game = Broadcaster(queue_size = 2)
+        spectator = game.subscribe()
+        game.play((0, 0), 'X')
+        game.play((1, 1), 'O')
+        self.assertEqual(spectator.resyncs, 1)
+        self.assertEqual(decode_message(await spectator.__anext__()), ('snapshot', 2, 'X___O____'))
+
+    async def test_slow_spectator_at_game_end(self):
+        # A full queue when the game ends still finishes with the end message
+        game = Broadcaster(queue_size = 2)
+        spectator = game.subscribe()
+        for move, symbol in (((0, 0), 'X'), ((1, 0), 'O'), ((0, 1), 'X'), ((1, 1), 'O'), ((0, 2), 'X')):
+            game.play(move, symbol)
+        self.assertEqual(await self.read_all(spectator), [('snapshot', 5, 'XXXOO____'), ('end', 6, 'X')])
+
+    async def test_end_with_queue_of_one(self):
+        # With room for one message the end message is kept
+        game = Broadcaster(queue_size = 1)
+        spectator = game.subscribe()
+        for move, symbol in (((0, 0), 'X'), ((1, 0), 'O'), ((0, 1), 'X'), ((1, 1), 'O'), ((0, 2), 'X')):
+            game.play(move, symbol)
+        self.assertEqual(await self.read_all(spectator), [('end', 6, 'X')])
+
+    async def test_slow_spectator_dropped(self):
+        # With drop_slow the spectator is kicked and gets no more moves
+        game = Broadcaster(queue_size = 2, drop_slow = True)
+        slow = game.subscribe()
+        game.play((0, 0), 'X')
+        game.play((1, 1), 'O')
+        self.assertEqual(await self.read_all(slow), [('kicked', 2)])
+        self.assertEqual(len(game.subscribers), 0)
+
+    async def test_late_spectator_of_finished_game(self):
+        # Joining after the end gives the final board and result
+        game = Broadcaster()
+        for move, symbol in [((0, 0), 'X'), ((1, 0), 'O'), ((0, 1), 'X'), ((1, 1), 'O'), ((0, 2), 'X')]:
+            game.play(move, symbol)
+        messages = await self.read_all(game.subscribe())
+        self.assertEqual(messages, [('snapshot', 5, 'XXXOO____'), ('end', 6, 'X')])
+        self.assertEqual(await self.read_all(game.subscribe()), messages)
+
+    async def test_late_spectator_with_queue_of_one(self):
+        # Joining a finished game with room for one message gets the result
+        game = Broadcaster(queue_size = 1)
+        for move, symbol in [((0, 0), 'X'), ((1, 0), 'O'), ((0, 1), 'X'), ((1, 1), 'O'), ((0, 2), 'X')]:
+            game.play(move, symbol)
+        self.assertEqual(await self.read_all(game.subscribe()), [('end', 6, 'X')])
+
+    async def test_play_after_end(self):
+        # Handle a move once the game is over
+        game = Broadcaster()
+        for move, symbol in [((0, 0), 'X'), ((1, 0), 'O'), ((0, 1), 'X'), ((1, 1), 'O'), ((0, 2), 'X')]:
+            game.play(move, symbol)
+        with self.assertRaises(ValueError):
+            game.play((2, 2), 'O')
+
+class TestDecodeMessage(unittest.TestCase):
+
+    """
+    Test cases for decode_message function
+    """
+
+    def test_decode_invalid(self):
+        # Handle unknown and truncated messages
+        with self.assertRaises(ValueError):
+            decode_message(b'Z')
+        with self.assertRaises(ValueError):
+            decode_message(b'M\x01')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import unittest
+
+from unittest.mock import patch
+from fuzz import (
+    TARGETS,
+    adversarial_board,
+    check_case,
+    format_failure,
+    fuzz_chunk,
+    malformed_board,
+    reference_three_in_a_row,
+    run_fuzz,
+    shrink_case,
+)
+
+def no_diagonals(board_state, X_or_O):
+    # Three in a row which forgets the diagonals
+    reference_three_in_a_row(board_state, X_or_O)
+    return (any(all(cell == X_or_O for cell in row) for row in board_state)
+            or any(all(board_state[row][col] == X_or_O for row in range(3)) for col in range(3)))
+
+class TestFuzz(unittest.TestCase):
+
+    """
+    Test cases for the differential fuzzing harness
+    """
+
+    def test_fast_paths_match(self):
+        # Every fast path agrees with the reference code
+        checked, failures = fuzz_chunk(0, 5000)
+        self.assertEqual(checked, 5000)
+        self.assertEqual(failures, [], '\n'.join(map(format_failure, failures)))
+
+    def test_generators(self):
+        # Adversarial boards are well formed, malformed boards are rejected unless a row is not a list
+        rng = random.Random(1)
+        for _ in range(200):
+            self.assertIsNone(check_case(('correct_board_state', (adversarial_board(rng),))))
+        rejected = 0
+        row_types = set()
+        for _ in range(200):
+            board_state = malformed_board(rng)
+            try:
+                TARGETS['correct_board_state'][0](board_state)
+            except (ValueError, TypeError):
+                rejected += 1
+            else:
+                row_types.update(type(row) for row in board_state if type(row) is not list)
+        self.assertGreater(rejected, 120)
+        self.assertEqual(row_types, {tuple, str, set, dict})
+
+    def test_find_odd_symbol(self):
+        # A block played with a symbol switch_turn() rejects is kept, and the error swallowed, as in the reference
+        board_state = [['X', 'X', '_'], ['O', 'O', '_'], ['_'] * 3]
+        self.assertIsNone(check_case(('find_block', (board_state, [[0, 2], [1, 2]], 'Z', [False]))))
+        self.assertIsNone(check_case(('find_win', (board_state, [[0, 2], [1, 2]], None, [False]))))
+
+    def test_finds_and_shrinks(self):
+        # A fast path which misses diagonals is caught and shrunk to a bare diagonal
+        reference, _, arguments = TARGETS['three_in_a_row']
+        with patch.dict(TARGETS, {'three_in_a_row': (reference, no_diagonals, arguments)}):
+            _, failures = fuzz_chunk(2, 2000)
+            self.assertTrue(failures)
+            (name, (board_state, X_or_O)), expected, actual = failures[0]
+            self.assertEqual(name, 'three_in_a_row')
+            self.assertEqual(sum(cell != '_' for row in board_state for cell in row), 3)
+            self.assertEqual(expected[1], True)
+            self.assertEqual(actual[1], False)
+            self.assertEqual(shrink_case(failures[0][0]), failures[0][0])
+
+    def test_shrink_keeps_failing(self):
+        # Shrinking only accepts cases which still fail
+        case = ('three_in_a_row', ([['X', 'O', 'X'], ['O', 'X', 'O'], ['_', 'O', 'X']], 'X'))
+        reference, _, arguments = TARGETS['three_in_a_row']
+        with patch.dict(TARGETS, {'three_in_a_row': (reference, no_diagonals, arguments)}):
+            self.assertIsNotNone(check_case(case))
+            shrunk = shrink_case(case)
+            self.assertIsNotNone(check_case(shrunk))
+        self.assertEqual(shrunk, ('three_in_a_row', ([['X', '_', '_'], ['_', 'X', '_'], ['_', '_', 'X']], 'X')))
+
+    def test_run_fuzz(self):
+        # Cases are spread across a process pool
+        failures, cases_per_second = run_fuzz(4000, processes = 2, seed = 3)
+        self.assertEqual(failures, [])
+        self.assertGreater(cases_per_second, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import io
+import os
+import runpy
+import tempfile
+import unittest
+
+from unittest.mock import patch
+from gamelog import GameLog, read_records, recover
+from tictactoe import next_move, run_script
+
+class TestGameLog(unittest.TestCase):
+
+    """
+    Test cases for GameLog class and recover function
+    """
+
+    def setUp(self):
+        # Log in a temporary directory
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'games.log')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_recover_live_sessions(self):
+        # Finished sessions are dropped and live ones are rebuilt
+        with GameLog(self.path) as log:
+            log.start_game(1, 'X')
+            log.record_move(1, (1, 1), 'X')
+            log.record_move(1, (0, 0), 'O')
+            log.start_game(2, 'O')
+            log.record_move(2, (1, 1), 'X')
+            log.end_game(2)
+        sessions = recover(self.path)
+        self.assertEqual(list(sessions), [1])
+        self.assertEqual(sessions[1]['board_state'], [['O', '_', '_'],
+                                                      ['_', 'X', '_'],
+                                                      ['_', '_', '_']])
+        self.assertEqual(sessions[1]['X_or_O'], 'X')
+        self.assertEqual(sessions[1]['first_or_second'], 'X')
+
+    def test_group_commit(self):
+        # Many records share one fsync
+        with patch('gamelog.os.fsync') as mocked_fsync:
+            log = GameLog(self.path, fsync_interval = 60)
+            sequences = [log.record_move(session, (0, 0), 'X') for session in range(1000)]
+            log.commit()
+            self.assertTrue(log.wait(sequences[-1], timeout = 0))
+            self.assertEqual(mocked_fsync.call_count, 1)
+            log.close()
+        self.assertEqual(len(read_records(self.path)[0]), 1000)
+
+    def test_wait_for_background_commit(self):
+        # Background thread makes records durable without an explicit commit
+        with GameLog(self.path, fsync_interval = 0.001) as log:
+            sequence = log.start_game(1, 'O')
+            self.assertTrue(log.wait(sequence, timeout = 5))
+
+    def test_commit_failure_surfaced(self):
+        # A failed fsync keeps the batch and is raised by wait, append and close
+        with patch('gamelog.os.fsync', side_effect = OSError("disk full")):
+            log = GameLog(self.path, fsync_interval = 0.001)
+            sequence = log.start_game(1, 'X')
+            with self.assertRaises(OSError):
+                log.wait(sequence)
+            log.thread.join(5)
+            self.assertFalse(log.thread.is_alive())
+            self.assertEqual(len(log.buffer), 1)
+            with self.assertRaises(OSError):
+                log.record_move(1, (0, 0), 'X')
+            with self.assertRaises(OSError):
+                log.close()
+
+    def test_recover_torn_tail(self):
+        # A half-written record is ignored and cut off
+        with GameLog(self.path) as log:
+            log.start_game(1, 'X')
+            log.record_move(1, (2, 2), 'X')
+        size = os.path.getsize(self.path)
+        with open(self.path, 'ab') as log_file:
+            log_file.write(b'\x0b\x00\x00\x00garbage')
+        sessions = recover(self.path)
+        self.assertEqual(sessions[1]['board_state'][2][2], 'X')
+        self.assertEqual(os.path.getsize(self.path), size)
+
+    def test_reopen_after_torn_tail(self):
+        # Reopening cuts off a torn tail, so records written afterwards can be read back
+        with GameLog(self.path) as log:
+            log.start_game(1, 'X')
+        with open(self.path, 'ab') as log_file:
+            log_file.write(b'\x0b\x00')
+        with GameLog(self.path) as log:
+            log.start_game(2, 'O')
+        self.assertEqual(sorted(recover(self.path)), [1, 2])
+
+    def test_recover_skips_corrupt_session(self):
+        # An illegal move only loses its own session
+        with GameLog(self.path) as log:
+            log.start_game(1, 'X')
+            log.record_move(1, (1, 1), 'X')
+            log.record_move(1, (1, 1), 'O')
+            log.record_move(1, (0, 0), 'X')
+            log.start_game(2, 'O')
+            log.record_move(2, (0, 0), 'X')
+        sessions = recover(self.path)
+        self.assertEqual(list(sessions), [2])
+        self.assertEqual(sessions[2]['board_state'][0][0], 'X')
+
+    def test_games_logged(self):
+        # Scripted games are logged and ended, an interrupted terminal game recovers where it stopped
+        script_file = io.StringIO("X;1 1;1 2;3 3\nO;2 2\n")
+        with GameLog(self.path) as log:
+            self.assertEqual(run_script(script_file, io.StringIO(), game_log = log, first_session = 10), 2)
+            log.start_game(20, 'X')
+            board_state = [['_'] * 3 for _ in range(3)]
+            with patch('builtins.input', return_value = '1 1'), patch('builtins.print'):
+                X_or_O = next_move(board_state, 'X', 'X', [False], game_log = log, session_id = 20)
+                X_or_O = next_move(board_state, X_or_O, 'X', [False], game_log = log, session_id = 20)
+        session_ids = {body[1:9] for body in read_records(self.path)[0]}
+        self.assertEqual(len(session_ids), 3)
+        sessions = recover(self.path)
+        self.assertEqual(list(sessions), [20])
+        self.assertEqual(sessions[20]['board_state'], board_state)
+        self.assertEqual(sessions[20]['X_or_O'], X_or_O)
+
+    def test_recover_drops_finished_session(self):
+        # A win whose end record was lost is not live
+        with GameLog(self.path) as log:
+            log.start_game(1, 'X')
+            for move, symbol in (((0, 0), 'X'), ((1, 0), 'O'), ((0, 1), 'X'), ((1, 1), 'O'), ((0, 2), 'X')):
+                log.record_move(1, move, symbol)
+        self.assertEqual(recover(self.path), {})
+
+    def test_cli_resumes_latest_session(self):
+        # --log resumes the latest unfinished game and ends the others
+        with GameLog(self.path) as log:
+            log.start_game(1, 'O')
+            log.start_game(2, 'X')
+            log.record_move(2, (1, 1), 'X')
+            log.record_move(2, (0, 0), 'O')
+        moves = iter(['3 3', '1 3', '3 1', '2 3', '3 2', '1 2'])
+        with patch('sys.argv', ['tictactoe.py', '--log', self.path]), \
+             patch('builtins.input', side_effect = lambda prompt: next(moves)), patch('builtins.print'):
+            runpy.run_path(os.path.join(os.path.dirname(__file__), 'tictactoe.py'), run_name = '__main__')
+        records = read_records(self.path)[0]
+        self.assertEqual([body[:1] for body in records].count(b'S'), 2)
+        self.assertEqual(recover(self.path), {})
+
+    def test_recover_missing_log(self):
+        # No log means no sessions
+        self.assertEqual(recover(self.path), {})
+
+    def test_append_after_close(self):
+        # Handle writes to a closed log and invalid side choice
+        log = GameLog(self.path)
+        with self.assertRaises(ValueError):
+            log.start_game(1, '_')
+        log.close()
+        with self.assertRaises(ValueError):
+            log.end_game(1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+from gametree import (
+    iter_games,
+    iter_positions,
+    is_canonical_child,
+)
+from solver import winner
+
+class TestIterGames(unittest.TestCase):
+
+    """
+    Test cases for iter_games function
+    """
+
+    def test_iter_games_full_tree(self):
+        # Every game from the empty board
+        self.assertEqual(sum(1 for _ in iter_games([['_'] * 3 for _ in range(3)])), 255168)
+
+    def test_iter_games_is_lazy(self):
+        # First game is available without walking the tree
+        game = next(iter_games([['_'] * 3 for _ in range(3)]))
+        self.assertEqual(len(game), 7)
+        self.assertEqual(game[0], (0, 0))
+
+    def test_iter_games_from_position(self):
+        # Two squares left: 'X' wins at (2, 2) at once, or 'O' fills it after (2, 1)
+        board_state = [['X', 'O', 'X'],
+                       ['O', 'X', 'O'],
+                       ['O', '_', '_']]
+        self.assertEqual(list(iter_games(board_state, 'X')), [((2, 1), (2, 2)), ((2, 2),)])
+
+    def test_iter_games_finished_game(self):
+        # A won position yields one empty game
+        board_state = [['X', 'X', 'X'],
+                       ['O', 'O', '_'],
+                       ['_', '_', '_']]
+        self.assertEqual(list(iter_games(board_state, 'O')), [()])
+
+    def test_iter_games_invalid_board(self):
+        # Handle improper matrix
+        with self.assertRaises(ValueError):
+            list(iter_games([['_', '_'], ['_', '_']]))
+
+class TestIterPositions(unittest.TestCase):
+
+    """
+    Test cases for iter_positions function
+    """
+
+    def brute_force(self, cells, X_or_O, seen):
+        # Reference enumeration using a set of seen positions
+        position = ''.join(cells)
+        if position in seen:
+            return
+        seen.add(position)
+        if winner(position) or '_' not in position:
+            return
+        for i in range(9):
+            if cells[i] == '_':
+                cells[i] = X_or_O
+                self.brute_force(cells, 'O' if X_or_O == 'X' else 'X', seen)
+                cells[i] = '_'
+
+    def test_iter_positions_empty_board(self):
+        # 5,478 unique positions, each yielded once
+        positions = list(iter_positions([['_'] * 3 for _ in range(3)]))
+        self.assertEqual(len(positions), 5478)
+        self.assertEqual(len(set(positions)), 5478)
+
+    def test_iter_positions_matches_brute_force(self):
+        # Same positions as a seen-set search from a midgame position
+        board_state = [['X', '_', '_'],
+                       ['_', 'O', '_'],
+                       ['_', '_', 'X']]
+        seen = set()
+        self.brute_force(list('X___O___X'), 'O', seen)
+        positions = list(iter_positions(board_state, 'O'))
+        self.assertEqual(len(positions), len(seen))
+        self.assertEqual(set(positions), seen)
+
+    def test_iter_positions_starts_with_given_position(self):
+        # Starting position comes first
+        board_state = [['X', 'O', '_'],
+                       ['_', '_', '_'],
+                       ['_', '_', '_']]
+        self.assertEqual(next(iter_positions(board_state, 'X')), 'XO_______')
+
+    def test_is_canonical_child(self):
+        # Only the lowest removable stone of the mover gives the canonical parent
+        cells = list('X___O___X')
+        self.assertTrue(is_canonical_child(cells, 0, 'X', set()))
+        self.assertFalse(is_canonical_child(cells, 8, 'X', set()))
+        self.assertTrue(is_canonical_child(cells, 8, 'X', {0}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+
+from gomoku import GomokuBoard, choose_gomoku_move, find_forced_win
+
+def make_board(stones, size = 15):
+    rows = [['_'] * size for _ in range(size)]
+    for (row, col), symbol in stones.items():
+        rows[row][col] = symbol
+    return GomokuBoard.from_rows([''.join(row) for row in rows])
+
+class TestGomokuBoard(unittest.TestCase):
+
+    """
+    Test cases for GomokuBoard class
+    """
+
+    def test_play_and_undo(self):
+        # Undo restores the window counts and hash
+        board = make_board({(7, 7): 'X', (7, 8): 'O'})
+        live = {symbol: [set(windows) for windows in board.live[symbol]] for symbol in ('X', 'O')}
+        counts = {symbol: list(board.counts[symbol]) for symbol in ('X', 'O')}
+        start_hash = board.hash
+        for square, symbol in ((100, 'X'), (101, 'O'), (115, 'X')):
+            board.play(square, symbol)
+        for square in (115, 101, 100):
+            board.undo(square)
+        self.assertEqual(board.live, live)
+        self.assertEqual(board.counts, counts)
+        self.assertEqual(board.hash, start_hash)
+
+    def test_winning_squares(self):
+        # Open four has both ends, blocked four has one
+        board = make_board({(7, 4): 'X', (7, 5): 'X', (7, 6): 'X', (7, 7): 'X'})
+        self.assertEqual(board.winning_squares('X'), {7 * 15 + 3, 7 * 15 + 8})
+        board.play(7 * 15 + 3, 'O')
+        self.assertEqual(board.winning_squares('X'), {7 * 15 + 8})
+        self.assertEqual(board.winning_squares('O'), set())
+
+    def test_winner(self):
+        # Five in a row on the diagonal
+        board = make_board({(i, i): 'O' for i in range(5)})
+        self.assertEqual(board.winner(), 'O')
+        board.undo(0)
+        self.assertIsNone(board.winner())
+
+    def test_candidate_moves(self):
+        # Empty board plays the centre, otherwise squares near stones
+        self.assertEqual(GomokuBoard().candidate_moves(), [7 * 15 + 7])
+        board = make_board({(0, 0): 'X'})
+        self.assertEqual(board.candidate_moves(), [1, 2, 15, 16, 17, 30, 31, 32])
+
+    def test_invalid_boards(self):
+        # Bad k, non-square rows, unexpected symbols and occupied squares
+        with self.assertRaises(ValueError):
+            GomokuBoard(5, 6)
+        with self.assertRaises(ValueError):
+            GomokuBoard.from_rows(['___', '__'])
+        with self.assertRaises(ValueError):
+            GomokuBoard.from_rows(['___', '_Z_', '___'], k = 3)
+        board = GomokuBoard()
+        board.play(0, 'X')
+        with self.assertRaises(ValueError):
+            board.play(0, 'O')
+
+class TestFindForcedWin(unittest.TestCase):
+
+    """
+    Test cases for find_forced_win function
+    """
+
+    def test_open_three(self):
+        # Open three becomes an open four
+        board = make_board({(7, 5): 'X', (7, 6): 'X', (7, 7): 'X', (0, 0): 'O', (0, 1): 'O'})
+        line = find_forced_win(board, 'X')
+        self.assertIn(line[0], [(7, 4), (7, 8)])
+
+    def test_four_three(self):
+        # Blocked three and blocked four meet at one square, found with fours only
+        board = make_board({(7, 4): 'O', (7, 5): 'X', (7, 6): 'X', (7, 7): 'X',
+                            (3, 8): 'O', (4, 8): 'X', (5, 8): 'X', (6, 8): 'X'})
+        self.assertEqual(find_forced_win(board, 'X', max_threes = 0), [(7, 8)])
+
+    def test_double_three(self):
+        # Two open twos crossing at one square make two threes at once
+        board = make_board({(7, 6): 'X', (7, 7): 'X', (5, 8): 'X', (6, 8): 'X',
+                            (0, 0): 'O', (0, 2): 'O', (14, 14): 'O', (14, 0): 'O'})
+        self.assertEqual(find_forced_win(board, 'X'), [(7, 8)])
+        self.assertIsNone(find_forced_win(board, 'X', max_threes = 0))
+
+    def test_double_four(self):
+        # One move makes two fours, and nothing is left once the defender takes it
+        board = make_board({(7, 3): 'O', (7, 4): 'X', (7, 5): 'X', (7, 6): 'X',
+                            (3, 7): 'O', (4, 7): 'X', (5, 7): 'X', (6, 7): 'X'})
+        line = find_forced_win(board, 'X', max_threes = 0)
+        self.assertEqual(line[0], (7, 7))
+        self.assertEqual(len(line), 1)
+        board.play(7 * 15 + 7, 'O')
+        line = find_forced_win(board, 'X', max_threes = 0)
+        self.assertIsNone(line)
+
+    def test_defender_four(self):
+        # Blocking the defender's four costs the tempo, unless the block makes a second three
+        stones = {(7, 5): 'X', (7, 6): 'X', (7, 7): 'X', (2, 0): 'X',
+                  (2, 1): 'O', (2, 2): 'O', (2, 3): 'O', (2, 4): 'O'}
+        self.assertIsNone(find_forced_win(make_board(stones), 'X'))
+        stones.update({(3, 5): 'X', (4, 5): 'X'})
+        self.assertEqual(find_forced_win(make_board(stones), 'X'), [(2, 5)])
+
+    def test_quiet_position(self):
+        # No threats, so no forced win, and the board is left as it was
+        board = make_board({(7, 7): 'X', (7, 8): 'O'})
+        start_hash = board.hash
+        self.assertIsNone(find_forced_win(board, 'X'))
+        self.assertEqual(board.hash, start_hash)
+        self.assertEqual(board.stones, 2)
+
+class TestChooseGomokuMove(unittest.TestCase):
+
+    """
+    Test cases for choose_gomoku_move function
+    """
+
+    def test_win_before_block(self):
+        # Completes its own four rather than blocking
+        board = make_board({(7, 3): 'O', (7, 4): 'X', (7, 5): 'X', (7, 6): 'X', (7, 7): 'X',
+                            (0, 0): 'O', (0, 1): 'O', (0, 2): 'O', (0, 3): 'O'})
+        self.assertEqual(choose_gomoku_move(board, 'X'), (7, 8))
+
+    def test_block(self):
+        # Blocks the opponent's four
+        board = make_board({(0, 0): 'O', (0, 1): 'O', (0, 2): 'O', (0, 3): 'O', (7, 7): 'X'})
+        self.assertEqual(choose_gomoku_move(board, 'X'), (0, 4))
+
+    def test_plays_forced_win(self):
+        # Starts the double three
+        board = make_board({(7, 6): 'X', (7, 7): 'X', (5, 8): 'X', (6, 8): 'X',
+                            (0, 0): 'O', (0, 2): 'O', (14, 14): 'O', (14, 0): 'O'})
+        self.assertEqual(choose_gomoku_move(board, 'X'), (7, 8))
+
+    def test_stops_continuous_fours(self):
+        # Takes the square the opponent's four-three starts from
+        board = make_board({(7, 4): 'X', (7, 5): 'O', (7, 6): 'O', (7, 7): 'O',
+                            (3, 8): 'X', (4, 8): 'O', (5, 8): 'O', (6, 8): 'O', (12, 12): 'X'})
+        self.assertEqual(choose_gomoku_move(board, 'X'), (7, 8))
+
+    def test_self_play(self):
+        # Engines finish a game on a small board without illegal moves
+        board = GomokuBoard(9, 5)
+        X_or_O = 'X'
+        while board.winner() is None:
+            move = choose_gomoku_move(board, X_or_O, max_depth = 4)
+            if move is None:
+                break
+            board.play(move[0] * 9 + move[1], X_or_O)
+            X_or_O = 'O' if X_or_O == 'X' else 'X'
+        self.assertTrue(board.winner() or board.stones == 81)
+
+    def test_invalid_symbol(self):
+        # Only 'X' and 'O' can move
+        with self.assertRaises(ValueError):
+            choose_gomoku_move(GomokuBoard(), '_')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+from unittest.mock import patch
+from opening_book import (
+    position_key,
+    build_book,
+    write_book,
+    OpeningBook,
+)
+from tictactoe import choose_move, next_move
+
+class TestPositionKey(unittest.TestCase):
+
+    """
+    Test cases for position_key function
+    """
+
+    def test_position_key_empty(self):
+        # Empty board is key 0
+        self.assertEqual(position_key([['_'] * 3 for _ in range(3)]), 0)
+
+    def test_position_key_digits(self):
+        # 'X' in the first square is 1, 'O' in the second is 2 * 3
+        board_state = [['X', 'O', '_'],
+                       ['_', '_', '_'],
+                       ['_', '_', '_']]
+        self.assertEqual(position_key(board_state), 7)
+
+    def test_position_key_larger_board(self):
+        # Keys are defined for larger boards too
+        board_state = [['_'] * 4 for _ in range(4)]
+        board_state[3][3] = 'O'
+        self.assertEqual(position_key(board_state), 2 * 3 ** 15)
+
+    def test_position_key_invalid_symbol(self):
+        # Handle passed board_state with invalid symbol '%'
+        with self.assertRaises(ValueError):
+            position_key([['%', '_', '_'], ['_', '_', '_'], ['_', '_', '_']])
+
+class TestOpeningBook(unittest.TestCase):
+
+    """
+    Test cases for building, writing and probing an opening book
+    """
+
+    def setUp(self):
+        # Build a small book in a temporary file
+        self.entries = build_book(3)
+        handle, self.path = tempfile.mkstemp(suffix = '.bin')
+        os.close(handle)
+        write_book(self.path, self.entries, 3)
+        self.book = OpeningBook(self.path)
+
+    def tearDown(self):
+        self.book.close()
+        os.remove(self.path)
+
+    def test_build_book_sorted_and_unique(self):
+        # Entries are sorted by key with no duplicates
+        keys = [key for key, _ in self.entries]
+        self.assertEqual(keys, sorted(set(keys)))
+
+    def test_build_book_counts(self):
+        # 1 empty board, 9 one-ply boards and 72 two-ply boards
+        self.assertEqual(len(self.book), 1 + 9 + 72)
+
+    def test_probe_empty_board(self):
+        # The book opens in the centre
+        self.assertEqual(self.book.probe([['_'] * 3 for _ in range(3)]), (1, 1))
+
+    def test_probe_answers_edge_opening(self):
+        # After an edge opening, the book reply keeps the draw
+        board_state = [['_', 'X', '_'],
+                       ['_', '_', '_'],
+                       ['_', '_', '_']]
+        row, col = self.book.probe(board_state)
+        self.assertIn((row, col), [(0, 0), (0, 2), (1, 1), (2, 1)])
+
+    def test_probe_missing_position(self):
+        # Positions deeper than the book are not found
+        board_state = [['X', 'O', 'X'],
+                       ['_', '_', '_'],
+                       ['_', '_', '_']]
+        self.assertIsNone(self.book.probe(board_state))
+
+    def test_invalid_book_file(self):
+        # Handle a file which is not an opening book
+        with open(self.path, 'wb') as book_file:
+            book_file.write(b'not a book at all')
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+    def test_next_move_uses_book(self):
+        # Computer plays the book move instead of the heuristics
+        board_state = [['_'] * 3 for _ in range(3)]
+        move_made = [False]
+        with patch('builtins.print'):
+            result = next_move(board_state, 'X', 'O', move_made, self.book)
+        self.assertEqual(result, 'O')
+        self.assertEqual(board_state[1][1], 'X')
+        self.assertTrue(move_made == [True])
+
+    def test_choose_move_invalid_board_with_book(self):
+        # The board is validated before the book is probed
+        with self.assertRaises(ValueError):
+            choose_move(None, 'X', self.book)
+        with self.assertRaises(ValueError):
+            choose_move([['_'] * 3, ['_'] * 3], 'X', self.book)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import random
+import unittest
+
+from unittest.mock import patch
+from ponder import Ponderer
+from tictactoe import next_move
+from tracing import tracer
+
+class TestPonderer(unittest.TestCase):
+
+    """
+    Test cases for Ponderer class
+    """
+
+    def setUp(self):
+        # Engine which records the positions it is asked about
+        self.calls = []
+        def engine(board_state, X_or_O):
+            self.calls.append(''.join(cell for row in board_state for cell in row))
+            return next((r, c) for r in range(3) for c in range(3) if board_state[r][c] == '_')
+        self.ponderer = Ponderer(engine)
+
+    def test_ponder_every_human_move(self):
+        # One reply per legal human move
+        board_state = [['X', '_', 'X'],
+                       ['O', 'O', '_'],
+                       ['_', '_', '_']]
+        self.ponderer.start(board_state, 'X', 'O')
+        self.ponderer.wait(5)
+        self.assertEqual(len(self.calls), 4)       # One of the five human moves wins, so needs no reply
+        self.assertEqual(len(self.ponderer.cache), 4)
+
+    def test_reply_hit(self):
+        # Pondered reply is returned without calling the engine again
+        board_state = [['_'] * 3 for _ in range(3)]
+        self.ponderer.start(board_state, 'X', 'O')
+        self.ponderer.wait(5)
+        board_state[1][1] = 'X'
+        calls = len(self.calls)
+        self.assertEqual(self.ponderer.reply(board_state, 'O'), (0, 0))
+        self.assertEqual(len(self.calls), calls)
+        self.assertEqual((self.ponderer.hits, self.ponderer.misses), (1, 0))
+
+    def test_reply_miss(self):
+        # Falls back to the engine for a position which was not pondered
+        board_state = [['X', '_', '_'],
+                       ['_', '_', '_'],
+                       ['_', '_', '_']]
+        self.assertEqual(self.ponderer.reply(board_state, 'O'), (0, 1))
+        self.assertEqual((self.ponderer.hits, self.ponderer.misses), (0, 1))
+
+    def test_start_does_not_share_board(self):
+        # Game can change its board while pondering runs
+        board_state = [['_'] * 3 for _ in range(3)]
+        self.ponderer.start(board_state, 'X', 'O')
+        board_state[0][0] = 'X'
+        self.ponderer.wait(5)
+        self.assertEqual(len(self.calls), 9)
+        self.assertTrue(all(position.count('X') == 1 for position in self.calls))
+
+    def test_start_invalid_board(self):
+        # Handle improper matrix
+        with self.assertRaises(ValueError):
+            self.ponderer.start([['_', '_'], ['_', '_']], 'X', 'O')
+
+    @patch('builtins.input', side_effect = ['1 1'])
+    def test_next_move_ponders(self, mock_input):
+        # Human turn starts pondering and the computer's turn uses it
+        ponderer = Ponderer()
+        board_state = [['_'] * 3 for _ in range(3)]
+        with patch('builtins.print'):
+            X_or_O = next_move(board_state, 'X', 'X', [False], None, ponderer)
+            ponderer.wait(5)
+            next_move(board_state, X_or_O, 'X', [False], None, ponderer)
+        self.assertEqual(board_state[1][1], 'O')
+        self.assertEqual(ponderer.hits, 1)
+
+    @patch('builtins.input', side_effect = ['1 1'])
+    def test_trace_records_played_moves_only(self, mock_input):
+        # Pondered guesses are not traced, the pondered reply is traced when played
+        ponderer = Ponderer()
+        board_state = [['_'] * 3 for _ in range(3)]
+        tracer.clear()
+        tracer.enable()
+        try:
+            with patch('builtins.print'):
+                X_or_O = next_move(board_state, 'X', 'X', [False], None, ponderer)
+                ponderer.wait(5)
+                next_move(board_state, X_or_O, 'X', [False], None, ponderer)
+            events = [(event, fields) for _, event, fields in tracer.events]
+        finally:
+            tracer.disable()
+            tracer.clear()
+        self.assertEqual(events, [('move', {'symbol': 'X', 'move': (0, 0), 'source': 'human'}),
+                                  ('move', {'symbol': 'O', 'move': (1, 1), 'source': 'ponder'})])
+
+    def test_seeded_replies_repeat(self):
+        # Pondered and unpondered replies agree for a seed, and the random module is left alone
+        corners = set()
+        state = random.getstate()
+        for seed in range(8):
+            board_state = [['_'] * 3 for _ in range(3)]
+            pondered = Ponderer(seed = seed)
+            pondered.start(board_state, 'X', 'O')
+            pondered.wait(5)
+            board_state[1][1] = 'X'                 # Computer answers the centre with a random corner
+            reply = pondered.reply(board_state, 'O')
+            self.assertEqual(Ponderer(seed = seed).reply(board_state, 'O'), reply)
+            corners.add(reply)
+        self.assertEqual(random.getstate(), state)
+        self.assertGreater(len(corners), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+
+from solver import (
+    flatten_board,
+    winner,
+    solve,
+    score_to_distance,
+    best_moves,
+    analyse,
+    MAX_SCORE,
+)
+
+class TestSolve(unittest.TestCase):
+
+    """
+    Test cases for solve function
+    """
+
+    def test_solve_empty_board_is_draw(self):
+        # Perfect play from the empty board is a draw
+        self.assertEqual(solve('_' * 9, 'X'), 0)
+
+    def test_solve_win_in_one(self):
+        # 'X' to move can complete the top row immediately
+        score = solve('XX_OO____', 'X')
+        self.assertEqual(score, MAX_SCORE - 1)
+        self.assertEqual(score_to_distance(score), 1)
+
+    def test_solve_lost_position(self):
+        # 'O' to move cannot stop both of X's threats
+        score = solve('X_X_O___X', 'O')
+        self.assertLess(score, 0)
+        self.assertEqual(score_to_distance(score), 2)
+
+    def test_solve_finished_game(self):
+        # The player to move has already lost
+        self.assertEqual(solve('XXXOO____', 'O'), -MAX_SCORE)
+
+class TestBestMoves(unittest.TestCase):
+
+    """
+    Test cases for best_moves and its helpers
+    """
+
+    def test_flatten_board(self):
+        # Flatten rows in order
+        board_state = [['X', '_', '_'],
+                       ['_', 'O', '_'],
+                       ['_', '_', 'X']]
+        self.assertEqual(flatten_board(board_state), 'X___O___X')
+
+    def test_flatten_board_invalid_symbol(self):
+        # Handle passed board_state with invalid symbol 'x'
+        with self.assertRaises(ValueError):
+            flatten_board([['x', '_', '_'], ['_', '_', '_'], ['_', '_', '_']])
+
+    def test_winner(self):
+        # Detect diagonal and no winner
+        self.assertEqual(winner('O___O___O'), 'O')
+        self.assertIsNone(winner('XO_______'))
+
+    def test_best_moves_takes_win_over_block(self):
+        # 'O' can win in the middle row, which beats blocking X's top row
+        board_state = [['X', 'X', '_'],
+                       ['O', 'O', '_'],
+                       ['X', '_', '_']]
+        self.assertEqual(best_moves(board_state, 'O'), [[1, 2]])
+
+    def test_best_moves_opening_prefers_centre(self):
+        # Every first move draws, so the centre comes first
+        board_state = [['_'] * 3 for _ in range(3)]
+        self.assertEqual(best_moves(board_state, 'X')[0], [1, 1])
+        self.assertEqual(len(best_moves(board_state, 'X')), 9)
+
+    def test_best_moves_finished_game(self):
+        # No moves once the game is won
+        board_state = [['X', 'X', 'X'],
+                       ['O', 'O', '_'],
+                       ['_', '_', '_']]
+        self.assertEqual(best_moves(board_state, 'O'), [])
+
+class TestAnalyse(unittest.TestCase):
+
+    """
+    Test cases for analyse function
+    """
+
+    def test_analyse_ranks_every_move(self):
+        # Edges draw, corners lose to a fork in 4 plies
+        board_state = [['X', '_', '_'],
+                       ['_', 'O', '_'],
+                       ['_', '_', 'X']]
+        analysis = analyse(board_state, 'O')
+        self.assertEqual([line['move'] for line in analysis], [(0, 1), (1, 0), (1, 2), (2, 1), (0, 2), (2, 0)])
+        self.assertEqual(analysis[0], {'move': (0, 1), 'value': 'draw', 'distance': None, 'score': 0})
+        self.assertEqual(analysis[-1], {'move': (2, 0), 'value': 'loss', 'distance': 4, 'score': -6})
+
+    def test_analyse_win_distances(self):
+        # Immediate win ranks ahead of slower wins
+        board_state = [['X', 'X', '_'],
+                       ['O', 'O', '_'],
+                       ['_', '_', '_']]
+        analysis = analyse(board_state, 'X')
+        self.assertEqual(analysis[0]['move'], (0, 2))
+        self.assertEqual(analysis[0]['distance'], 1)
+
+    def test_analyse_finished_game(self):
+        # No analysis once the game is won
+        board_state = [['O', 'O', 'O'],
+                       ['X', 'X', '_'],
+                       ['X', '_', '_']]
+        self.assertEqual(analyse(board_state, 'X'), [])
+
+    def test_analyse_invalid_board(self):
+        # Handle improper matrix
+        with self.assertRaises(ValueError):
+            analyse([['_', '_'], ['_', '_']], 'X')
+
+if __name__ == '__main__':
+    unittest.main()
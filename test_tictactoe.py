@@ -15,6 +15,21 @@ from tictactoe import (
     find_corner,
     find_side,
     next_move,
+    completes_line,
+    build_pipeline,
+    centre_stage,
+    win_stage,
+    block_stage,
+    computer_strategy,
+    parse_move,
+    choose_move,
+    apply_move,
+    position_index,
+    position_tables,
+    heuristic_candidates,
+    POSITION_COUNT,
+    play_scripted_game,
+    run_script,
 )
 
 class TestDrawBoard(unittest.TestCase):
@@ -174,6 +189,13 @@ class TestThreeInARow(unittest.TestCase):
         with self.assertRaises(ValueError):
             three_in_a_row(invalid_board_state, 'X')
 
+    def test_three_in_a_row_unhashable_symbol(self):
+
+        # Test symbols which are not strings never match, as in the original row by row check
+        board_state = [['_'] * 3 for _ in range(3)]
+        self.assertFalse(three_in_a_row(board_state, []))
+        self.assertFalse(three_in_a_row(board_state, {'X': 1}))
+
 class TestIsLegalMove(unittest.TestCase):
 
     """
@@ -332,6 +354,15 @@ class TestFindWin(unittest.TestCase):
         self.assertTrue(move_made == [True])
         self.assertEqual(result, None)
 
+    def test_find_win_already_won(self):
+        # Test any move keeps an existing three in a row, so the first legal move is played
+        board_state = [['X', '_', '_'],
+                       ['X', '_', '_'],
+                       ['X', '_', '_']]
+        result = find_win(board_state, [[2, 2], [0, 1]], 'X', self.move_made)
+        self.assertFalse(result)
+        self.assertEqual(board_state[2][2], 'X')
+
 class TestFindBlock(unittest.TestCase):
 
     """
@@ -404,6 +435,15 @@ class TestFindBlock(unittest.TestCase):
         self.assertTrue(move_made == [True])
         self.assertEqual(result, None)
 
+    def test_find_block_already_lost(self):
+        # Test the human's existing three in a row counts as a threat on every legal move
+        board_state = [['_', '_', '_'],
+                       ['O', 'O', 'O'],
+                       ['_', '_', '_']]
+        result = find_block(board_state, [[0, 1], [2, 2]], 'X', self.move_made)
+        self.assertEqual(result, 'O')
+        self.assertEqual(board_state[0][1], 'X')
+
 class TestFindCorner(unittest.TestCase):
 
     """
@@ -540,6 +580,230 @@ class TestFindSide(unittest.TestCase):
         self.assertTrue(move_made == [True])
         self.assertEqual(result, None)
 
+class TestCompletesLine(unittest.TestCase):
+
+    """
+    Test cases for completes_line function
+    """
+
+    def setUp(self):
+        # Define board_state for following tests
+        self.board_state = [['X', '_', 'O'],
+                            ['_', 'X', 'O'],
+                            ['_', '_', '_']]
+
+    def test_completes_line_diagonal(self):
+        # 'X' completes the main diagonal
+        self.assertTrue(completes_line(self.board_state, 2, 2, 'X'))
+
+    def test_completes_line_column(self):
+        # 'O' completes the right column
+        self.assertTrue(completes_line(self.board_state, 2, 2, 'O'))
+
+    def test_completes_line_none(self):
+        # Bottom left completes nothing for 'O' and leaves the board unchanged
+        self.assertFalse(completes_line(self.board_state, 2, 0, 'O'))
+        self.assertEqual(self.board_state[2][0], '_')
+
+class TestBuildPipeline(unittest.TestCase):
+
+    """
+    Test cases for build_pipeline function and computer_strategy
+    """
+
+    def test_pipeline_stops_at_first_stage(self):
+        # Later stages are not called once a move is found
+        calls = []
+        def record_stage(board_state, legal_moves, X_or_O):
+            calls.append(X_or_O)
+        pipeline = build_pipeline([centre_stage, record_stage])
+        result = pipeline([['_'] * 3 for _ in range(3)], 'X')
+        self.assertEqual(result, [1, 1])
+        self.assertEqual(calls, [])
+
+    def test_pipeline_order(self):
+        # Win before block, and block when the order is swapped
+        board_state = [['X', 'X', '_'],
+                       ['O', 'O', '_'],
+                       ['_', '_', '_']]
+        self.assertEqual(build_pipeline([win_stage, block_stage])(board_state, 'O'), [1, 2])
+        self.assertEqual(build_pipeline([block_stage, win_stage])(board_state, 'O'), [0, 2])
+
+    def test_pipeline_no_move(self):
+        # Full board gives no move
+        board_state = [['X', 'O', 'X'],
+                       ['O', 'X', 'O'],
+                       ['O', 'X', 'O']]
+        self.assertIsNone(computer_strategy(board_state, 'X'))
+
+    def test_computer_strategy_does_not_change_board(self):
+        # Chosen move is returned, not played
+        board_state = [['X', 'O', 'X'],
+                       ['O', 'X', 'O'],
+                       ['X', 'O', '_']]
+        self.assertEqual(computer_strategy(board_state, 'O'), [2, 2])
+        self.assertEqual(board_state[2][2], '_')
+
+    def test_pipeline_invalid_board(self):
+        # Handle improper matrix
+        with self.assertRaises(ValueError):
+            computer_strategy([['X', 'O'], ['O', 'X']], 'X')
+
+class TestParseMove(unittest.TestCase):
+
+    """
+    Test cases for parse_move function
+    """
+
+    def test_parse_move_valid(self):
+        # Convert to zero-based coordinates, allowing extra spaces
+        self.assertEqual(parse_move(' 1   3 '), (0, 2))
+
+    def test_parse_move_invalid(self):
+        # Reject anything which is not two integers
+        self.assertIsNone(parse_move('1'))
+        self.assertIsNone(parse_move('a 2'))
+        self.assertIsNone(parse_move('1 2 3'))
+
+class TestChooseMove(unittest.TestCase):
+
+    """
+    Test cases for choose_move function
+    """
+
+    def test_choose_move_no_io(self):
+        # Choose the block without printing, asking for input or changing the board
+        board_state = [['X', 'O', 'X'],
+                       ['O', 'X', 'O'],
+                       ['X', 'O', '_']]
+        with patch('builtins.print') as mocked_print, patch('builtins.input') as mocked_input:
+            result = choose_move(board_state, 'O')
+        self.assertEqual(result, (2, 2))
+        self.assertEqual(board_state[2][2], '_')
+        mocked_print.assert_not_called()
+        mocked_input.assert_not_called()
+
+    def test_choose_move_full_board(self):
+        # Handle a board with no legal moves
+        board_state = [['X', 'O', 'X'],
+                       ['O', 'X', 'O'],
+                       ['O', 'X', 'O']]
+        with self.assertRaises(ValueError):
+            choose_move(board_state, 'X')
+
+class TestApplyMove(unittest.TestCase):
+
+    """
+    Test cases for apply_move function
+    """
+
+    def test_apply_move_continue(self):
+        # Play a move which does not end the game
+        board_state = [['_'] * 3 for _ in range(3)]
+        self.assertEqual(apply_move(board_state, (1, 1), 'X'), 'continue')
+        self.assertEqual(board_state[1][1], 'X')
+
+    def test_apply_move_win(self):
+        # Play a winning move
+        board_state = [['X', 'X', '_'],
+                       ['O', 'O', '_'],
+                       ['_', '_', '_']]
+        self.assertEqual(apply_move(board_state, (0, 2), 'X'), 'win')
+
+    def test_apply_move_draw(self):
+        # Fill the last square without a win
+        board_state = [['X', 'O', 'X'],
+                       ['O', 'X', 'O'],
+                       ['O', 'X', '_']]
+        self.assertEqual(apply_move(board_state, (2, 2), 'O'), 'draw')
+
+    def test_apply_move_illegal(self):
+        # Handle occupied square, out of bounds square and invalid symbol
+        board_state = [['X', '_', '_'],
+                       ['_', '_', '_'],
+                       ['_', '_', '_']]
+        with self.assertRaises(ValueError):
+            apply_move(board_state, (0, 0), 'O')
+        with self.assertRaises(ValueError):
+            apply_move(board_state, (3, 0), 'O')
+        with self.assertRaises(ValueError):
+            apply_move(board_state, (1, 1), '_')
+
+class TestPositionTables(unittest.TestCase):
+
+    """
+    Test cases for position_index, position_tables and heuristic_candidates functions
+    """
+
+    def test_position_index(self):
+        # Empty board is 0, 'X' top left is 1, 'O' bottom right is 2 * 3 ** 8
+        self.assertEqual(position_index([['_'] * 3 for _ in range(3)]), 0)
+        self.assertEqual(position_index([['X', '_', '_'], ['_', '_', '_'], ['_', '_', 'O']]), 1 + 2 * 3 ** 8)
+
+    def test_position_index_invalid(self):
+        # Handle improper matrix, invalid symbol and non-list board
+        with self.assertRaises(ValueError):
+            position_index([['_', '_'], ['_', '_']])
+        with self.assertRaises(ValueError):
+            position_index([['x', '_', '_'], ['_', '_', '_'], ['_', '_', '_']])
+        with self.assertRaises(ValueError):
+            position_index((('_',) * 3,) * 3)
+
+    def test_position_index_row_types(self):
+        # Tuple and string rows are read directly, set rows are indexed and fail like the original checks
+        self.assertEqual(position_index([('X', '_', '_'), '___', ['_', '_', 'O']]), 1 + 2 * 3 ** 8)
+        set_rows = [{'X', 'O', '_'}, ['_'] * 3, ['_'] * 3]
+        with self.assertRaises(TypeError):
+            position_index(set_rows)
+        with self.assertRaises(IndexError):
+            three_in_a_row(set_rows, 'X')
+        with self.assertRaises(TypeError):
+            is_legal_move(set_rows, 0, 0)
+        self.assertFalse(is_legal_move(set_rows, 3, 0))
+        with self.assertRaises(TypeError):
+            collect_legal_moves(set_rows)
+        with self.assertRaises(KeyError):
+            collect_legal_moves([dict.fromkeys('XO_'), ['_'] * 3, ['_'] * 3])
+
+    def test_position_tables_sizes(self):
+        # One entry per position in every table
+        self.assertTrue(all(len(table) == POSITION_COUNT for table in position_tables()))
+
+    def test_position_tables_terminal(self):
+        # Won and full boards are terminal, a game in progress is not
+        _, _, terminal = position_tables()
+        won = [['X', 'X', 'X'], ['O', 'O', '_'], ['_', '_', '_']]
+        full = [['X', 'O', 'X'], ['X', 'O', 'O'], ['O', 'X', 'X']]
+        in_progress = [['X', 'O', '_'], ['_', '_', '_'], ['_', '_', '_']]
+        self.assertEqual(terminal[position_index(won)], 1)
+        self.assertEqual(terminal[position_index(full)], 1)
+        self.assertEqual(terminal[position_index(in_progress)], 0)
+
+    def test_three_in_a_row_empty_symbol(self):
+        # Rows of '_' are still reported as three in a row for '_'
+        board_state = [['_'] * 3 for _ in range(3)]
+        self.assertTrue(three_in_a_row(board_state, '_'))
+        self.assertFalse(three_in_a_row(board_state, 'A'))
+
+    def test_heuristic_candidates(self):
+        # Centre on an empty board, and both corners once the centre is taken
+        self.assertEqual(heuristic_candidates([['_'] * 3 for _ in range(3)], 'X'), [[1, 1]])
+        board_state = [['_', 'X', '_'],
+                       ['_', 'O', '_'],
+                       ['X', '_', '_']]
+        self.assertEqual(heuristic_candidates(board_state, 'O'), [[0, 0], [0, 2], [2, 2]])
+
+    def test_heuristic_candidates_match_pipeline(self):
+        # Table agrees with computer_strategy.candidates for a win and a block
+        board_state = [['X', 'O', '_'],
+                       ['_', 'O', '_'],
+                       ['X', '_', '_']]
+        self.assertEqual(heuristic_candidates(board_state, 'X'), [[1, 0]])
+        self.assertEqual(heuristic_candidates(board_state, 'O'), [[2, 1]])
+        self.assertEqual(heuristic_candidates(board_state, 'X'), computer_strategy.candidates(board_state, 'X'))
+        with self.assertRaises(ValueError):
+            heuristic_candidates(board_state, '_')
+
 class TestNextMove(unittest.TestCase):
 
     """
@@ -609,7 +873,47 @@ class TestNextMove(unittest.TestCase):
         self.assertEqual(result, 'X')        
         self.assertEqual(board_state, [['X', 'O', 'X'],
                                        ['O', 'X', 'O'],
-                                       ['X', 'O', 'O']])      
-                    
+                                       ['X', 'O', 'O']])
+
+class TestScriptedGames(unittest.TestCase):
+
+    """
+    Test cases for play_scripted_game and run_script functions
+    """
+
+    def test_play_scripted_game_computer_wins(self):
+        # Human as 'O' plays sides, computer as 'X' takes centre then wins
+        with patch('builtins.input') as mocked_input, patch('sys.stdout', new_callable = io.StringIO) as mocked_stdout:
+            result = play_scripted_game('O;1 2;2 1;3 2', None)
+        self.assertEqual(result[0], 'X')
+        mocked_input.assert_not_called()
+        self.assertEqual(mocked_stdout.getvalue(), '')
+
+    def test_play_scripted_game_uses_next_move(self):
+        # Scripted games are played by the same next_move() as the terminal game
+        with patch('tictactoe.next_move', wraps = next_move) as mocked_next_move:
+            result = play_scripted_game('X;1 1;1 2;3 3', None)
+        self.assertEqual(mocked_next_move.call_count, result[1] + (result[0] == 'incomplete'))
+
+    def test_play_scripted_game_skips_rejected_inputs(self):
+        # Malformed, out of bounds and occupied squares are skipped like re-prompts
+        result = play_scripted_game(' x ;1 1;abc;4 4;1 1;3 3', None)
+        self.assertEqual(result, ('incomplete', 4, 3))
+
+    def test_play_scripted_game_incomplete(self):
+        # Running out of moves leaves the game incomplete
+        self.assertEqual(play_scripted_game('X;1 1', None), ('incomplete', 2, 0))
+
+    def test_play_scripted_game_invalid_side(self):
+        # Handle a side choice which is not 'X' or 'O'
+        self.assertEqual(play_scripted_game('@;1 1', None), ('invalid', 0, 0))
+
+    def test_run_script(self):
+        # One result line per game, skipping blank lines and comments
+        script_file = io.StringIO("# scripted games\nX;1 1\n\n@;1 1\n")
+        results_file = io.StringIO()
+        self.assertEqual(run_script(script_file, results_file), 2)
+        self.assertEqual(results_file.getvalue(), "incomplete 2 0\ninvalid 0 0\n")
+
 if __name__ == '__main__':
     unittest.main()
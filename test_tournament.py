@@ -0,0 +1,120 @@
+import multiprocessing
+import random
+import unittest
+
+from tournament import (
+    strategies,
+    register_strategy,
+    play_game,
+    play_match,
+    run_tournament,
+    elo_ratings,
+    format_report,
+)
+
+def last_empty(board_state, X_or_O):
+    # Strategy registered outside tournament.py, which spawned workers have to import
+    return next((r, c) for r in (2, 1, 0) for c in (2, 1, 0) if board_state[r][c] == '_')
+
+class TestStrategies(unittest.TestCase):
+
+    """
+    Test cases for the registered strategies
+    """
+
+    def test_default_strategies_registered(self):
+        # Heuristic, random and perfect play are available
+        self.assertTrue({'heuristic', 'random', 'perfect'} <= set(strategies))
+
+    def test_heuristic_takes_centre(self):
+        # Heuristic opens in the centre
+        board_state = [['_'] * 3 for _ in range(3)]
+        self.assertEqual(strategies['heuristic'](board_state, 'X'), (1, 1))
+
+    def test_heuristic_does_not_change_board(self):
+        # Heuristic finds the win without playing it on the passed board
+        board_state = [['X', 'O', '_'],
+                       ['X', 'O', '_'],
+                       ['_', '_', '_']]
+        self.assertEqual(strategies['heuristic'](board_state, 'X'), (2, 0))
+        self.assertEqual(board_state[2][0], '_')
+
+    def test_register_strategy(self):
+        # Register a strategy which always takes the first empty square
+        @register_strategy('first_empty')
+        def first_empty(board_state, X_or_O):
+            return next([r, c] for r in range(3) for c in range(3) if board_state[r][c] == '_')
+
+        self.addCleanup(strategies.pop, 'first_empty')
+        self.assertIs(strategies['first_empty'], first_empty)
+
+class TestPlayMatch(unittest.TestCase):
+
+    """
+    Test cases for play_game and play_match functions
+    """
+
+    def test_perfect_never_loses(self):
+        # Perfect play against random never loses from either side
+        a_wins, draws, b_wins = play_match('perfect', 'random', 50, 1)
+        self.assertEqual(b_wins, 0)
+        self.assertEqual(a_wins + draws, 50)
+
+    def test_perfect_self_play_draws(self):
+        # Perfect play against itself is always drawn
+        random.seed(0)
+        self.assertIsNone(play_game(strategies['perfect'], strategies['perfect']))
+
+    def test_illegal_move(self):
+        # Handle a strategy which plays an occupied square
+        with self.assertRaises(ValueError):
+            play_game(lambda board_state, X_or_O: [0, 0], strategies['random'])
+
+class TestRunTournament(unittest.TestCase):
+
+    """
+    Test cases for run_tournament, elo_ratings and format_report functions
+    """
+
+    def test_round_robin(self):
+        # Every pairing plays the requested number of games
+        results, games_per_second = run_tournament(['heuristic', 'random', 'perfect'], 20, processes = 2)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(sum(score) == 20 for score in results.values()))
+        self.assertGreater(games_per_second, 0)
+        report = format_report(results, games_per_second)
+        self.assertIn('games/sec', report)
+
+    def test_spawned_workers(self):
+        # Strategies registered by other modules reach workers which do not fork from the parent
+        register_strategy('last_empty')(last_empty)
+        self.addCleanup(strategies.pop, 'last_empty')
+        results, _ = run_tournament(['last_empty', 'perfect'], 10, processes = 1,
+                                    mp_context = multiprocessing.get_context('spawn'))
+        self.assertEqual(sum(results['last_empty', 'perfect']), 10)
+
+    def test_local_strategy(self):
+        # Handle a strategy which workers could not import by name
+        register_strategy('local')(lambda board_state, X_or_O: (1, 1))
+        self.addCleanup(strategies.pop, 'local')
+        with self.assertRaises(ValueError):
+            run_tournament(['local', 'random'], 10)
+
+    def test_unknown_strategy(self):
+        # Handle a name which is not registered
+        with self.assertRaises(ValueError):
+            run_tournament(['heuristic', 'nobody'], 10)
+
+    def test_elo_ratings(self):
+        # Stronger strategy gets the higher rating and ratings average to zero
+        ratings = elo_ratings({('strong', 'weak'): [70, 20, 10]})
+        self.assertGreater(ratings['strong'], ratings['weak'])
+        self.assertAlmostEqual(ratings['strong'] + ratings['weak'], 0)
+
+    def test_elo_ratings_unbeaten(self):
+        # An unbeaten strategy still gets a finite rating
+        ratings = elo_ratings({('strong', 'weak'): [100, 0, 0]})
+        self.assertLess(ratings['strong'], 1000)
+
+if __name__ == '__main__':
+    unittest.main()
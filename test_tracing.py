@@ -0,0 +1,99 @@
+import io
+import json
+import threading
+import unittest
+
+from tracing import Tracer, tracer
+from tictactoe import choose_move
+
+class TestTracer(unittest.TestCase):
+
+    """
+    Test cases for Tracer class
+    """
+
+    def test_disabled_records_nothing(self):
+        # Nothing is kept while disabled
+        trace = Tracer()
+        trace.record('move', move = (1, 1))
+        self.assertEqual(len(trace.events), 0)
+
+    def test_ring_buffer_overwrites_oldest(self):
+        # Only the newest events are kept once the buffer is full
+        trace = Tracer(capacity = 3)
+        trace.enable()
+        for i in range(5):
+            trace.record('stage', index = i)
+        self.assertEqual([fields['index'] for _, _, fields in trace.events], [2, 3, 4])
+        self.assertEqual(trace.dropped, 2)
+
+    def test_export_jsonl(self):
+        # One JSON object per line, oldest first
+        trace = Tracer()
+        trace.enable()
+        trace.record('move', symbol = 'X', move = (1, 1), source = 'pipeline')
+        trace.record('error', message = 'oops')
+        trace_file = io.StringIO()
+        self.assertEqual(trace.export_jsonl(trace_file), 2)
+        lines = [json.loads(line) for line in trace_file.getvalue().splitlines()]
+        self.assertEqual(lines[0]['event'], 'move')
+        self.assertEqual(lines[0]['move'], [1, 1])
+        self.assertEqual(lines[1]['message'], 'oops')
+        self.assertIn('ts', lines[1])
+
+    def test_clear(self):
+        # Clearing empties the buffer and resets the count
+        trace = Tracer()
+        trace.enable()
+        trace.record('move')
+        trace.clear()
+        self.assertEqual(len(trace.events), 0)
+        self.assertEqual(trace.dropped, 0)
+
+    def test_suppressed(self):
+        # Suppression only applies to the calling thread and ends with the block
+        trace = Tracer()
+        trace.enable()
+        with trace.suppressed():
+            trace.record('move', index = 0)
+            thread = threading.Thread(target = trace.record, args = ('move',), kwargs = {'index': 1})
+            thread.start()
+            thread.join()
+        trace.record('move', index = 2)
+        self.assertEqual([fields['index'] for _, _, fields in trace.events], [1, 2])
+
+class TestGameTracing(unittest.TestCase):
+
+    """
+    Test cases for events recorded by the game
+    """
+
+    def setUp(self):
+        tracer.clear()
+        tracer.enable()
+
+    def tearDown(self):
+        tracer.disable()
+        tracer.clear()
+
+    def test_choose_move_records_stage_and_move(self):
+        # Block stage hit followed by the move decision, in a live game where 'X' threatens the top row
+        board_state = [['X', 'X', '_'],
+                       ['_', 'O', '_'],
+                       ['_', '_', '_']]
+        self.assertEqual(choose_move(board_state, 'O'), (0, 2))
+        events = [(event, fields) for _, event, fields in tracer.events]
+        self.assertEqual(events[0], ('stage', {'stage': 'block_stage', 'symbol': 'O', 'move': [0, 2]}))
+        self.assertEqual(events[1], ('move', {'symbol': 'O', 'move': [0, 2], 'source': 'pipeline'}))
+
+    def test_choose_move_records_error(self):
+        # No legal moves is recorded before raising
+        board_state = [['X', 'O', 'X'],
+                       ['O', 'X', 'O'],
+                       ['O', 'X', 'O']]
+        with self.assertRaises(ValueError):
+            choose_move(board_state, 'X')
+        self.assertEqual(tracer.events[-1][1], 'error')
+
+if __name__ == '__main__':
+    unittest.main()
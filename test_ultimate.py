@@ -0,0 +1,136 @@
+import random
+import unittest
+
+from tictactoe import position_index, three_in_a_row
+from ultimate import (UltimateBoard, WIN_SCORE, choose_ultimate_move, search, to_grid, to_square,
+                      ultimate_tables)
+
+def random_game(seed, plies = 81):
+    board = UltimateBoard()
+    chooser = random.Random(seed)
+    while not board.result and len(board.history) < plies:
+        board.play(chooser.choice(board.legal_moves()))
+    return board
+
+class TestUltimateBoard(unittest.TestCase):
+
+    """
+    Test cases for UltimateBoard class
+    """
+
+    def test_grid_squares(self):
+        # Grid coordinates and squares convert both ways
+        self.assertEqual(to_square(0, 0), 0)
+        self.assertEqual(to_square(4, 4), 40)
+        self.assertEqual(to_square(3, 8), 5 * 9 + 2)
+        self.assertEqual([to_square(*to_grid(square)) for square in range(81)], list(range(81)))
+
+    def test_sent_to_sub_board(self):
+        # Cell played picks the opponent's sub-board
+        board = UltimateBoard()
+        self.assertEqual(len(board.legal_moves()), 81)
+        board.play(4 * 9 + 2)
+        self.assertEqual(board.legal_moves(), [2 * 9 + cell for cell in range(9)])
+        with self.assertRaises(ValueError):
+            board.play(4 * 9 + 3)
+
+    def test_free_choice_after_closed_sub_board(self):
+        # Sent to a won sub-board, the opponent may play anywhere open
+        board = UltimateBoard()
+        for square in (40, 36, 0, 4, 37, 9, 1, 14, 45, 3, 30, 27, 2):   # X wins cells 0, 1 and 2 of sub-board 0
+            board.play(square)
+        self.assertEqual(board.won['X'], 1)
+        board.play(2 * 9 + 0)
+        self.assertEqual(board.forced, -1)
+        self.assertTrue(all(square // 9 != 0 for square in board.legal_moves()))
+        self.assertEqual(len(board.legal_moves()), 81 - 9 - 9)
+
+    def test_matches_three_in_a_row(self):
+        # Bitboard wins agree with three_in_a_row() on every sub-board and the meta-board
+        for seed in range(30):
+            board = random_game(seed)
+            for sub_board in range(9):
+                rows = board.sub_board(sub_board)
+                for symbol in ('X', 'O'):
+                    self.assertEqual(bool(board.won[symbol] >> sub_board & 1), three_in_a_row(rows, symbol))
+            meta = [['X' if board.won['X'] >> square & 1 else 'O' if board.won['O'] >> square & 1 else '_'
+                     for square in range(row * 3, row * 3 + 3)] for row in range(3)]
+            for symbol in ('X', 'O'):
+                self.assertEqual(board.result == symbol, three_in_a_row(meta, symbol))
+            self.assertIsNotNone(board.result)
+            self.assertEqual(board.legal_moves(), [])
+
+    def test_undo(self):
+        # Undoing a whole game gets back to the empty board
+        board = random_game(7)
+        while board.history:
+            board.undo()
+        empty = UltimateBoard()
+        self.assertEqual(board.masks, empty.masks)
+        self.assertEqual((board.won, board.closed, board.forced, board.X_or_O, board.result, board.hash),
+                         (empty.won, empty.closed, empty.forced, empty.X_or_O, empty.result, empty.hash))
+
+    def test_illegal_moves(self):
+        # Occupied squares, out of range squares and finished games
+        board = UltimateBoard()
+        board.play(0)
+        board.play(1)
+        board.play(9)
+        with self.assertRaises(ValueError):
+            board.play(0)
+        with self.assertRaises(ValueError):
+            board.play(81)
+        with self.assertRaises(ValueError):
+            random_game(3).play(0)
+
+class TestUltimateSearch(unittest.TestCase):
+
+    """
+    Test cases for ultimate_tables, search and choose_ultimate_move functions
+    """
+
+    def test_tables(self):
+        # Empty board scores 0, two in a row is a threat on the third square
+        scores, threats = ultimate_tables()
+        self.assertEqual(scores[0], 0)
+        index = position_index([['X', 'X', '_'], ['_', 'O', '_'], ['_', '_', '_']])
+        self.assertEqual(threats[index], 1 << 2)
+        self.assertEqual(scores[index], 4 + 1 + 1 - (1 + 1 + 1))
+
+    def test_finds_winning_move(self):
+        # Wins the game in one whenever that is possible
+        checked = 0
+        for seed in range(200):
+            board = random_game(seed, 40)
+            winning = []
+            for square in board.legal_moves():
+                board.play(square)
+                if board.result not in (None, 'draw'):
+                    winning.append(square)
+                board.undo()
+            if winning:
+                square, score, _ = search(board, max_time = 1, max_depth = 2)
+                self.assertIn(square, winning)
+                self.assertEqual(score, WIN_SCORE - 1)
+                checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_search_leaves_board(self):
+        # Search plays and undoes on the board it is given
+        board = random_game(11, 20)
+        state = (board.hash, [list(masks) for masks in board.masks.values()], len(board.history))
+        square, _, depth = search(board, max_time = 0.2)
+        self.assertIn(square, board.legal_moves())
+        self.assertGreaterEqual(depth, 3)
+        self.assertEqual((board.hash, [list(masks) for masks in board.masks.values()], len(board.history)), state)
+
+    def test_choose_ultimate_move(self):
+        # Returns grid coordinates, and fails once the game is over
+        board = UltimateBoard()
+        row, col = choose_ultimate_move(board, max_time = 0.1)
+        self.assertIn(to_square(row, col), board.legal_moves())
+        with self.assertRaises(ValueError):
+            choose_ultimate_move(random_game(5))
+
+if __name__ == '__main__':
+    unittest.main()
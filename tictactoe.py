@@ -1,6 +1,15 @@
+import argparse
+import contextlib
 import copy
+import functools
+import os
 import random
-import logging
+import sys
+import threading
+import time
+
+from array import array
+from tracing import tracer
 
 board_state = [['_'] * 3 for _ in range(3)] # Track board state, initialized empty
 X_or_O = 'X'                                # Track whose turn it is; X is always first
@@ -8,7 +17,21 @@ move_made = [False]                         # Track if Computer move is made so
 first_or_second = ""                        # Track whether player is first (X) or second (O)
 allowed_symbols = {'_', 'X', 'O'}           # Dictionary for error-handling in board_state
 allowed_choices = {'X', 'O'}                # Dictionary for error-handling in symbol selection
-logging.basicConfig(level = logging.INFO)
+corner_moves = {(0,0), (0,2), (2,0), (2,2)} # Define all four corners
+side_moves = {(0,1), (1,0), (1,2), (2,1)}   # Define all four sides
+BOOK_PATH = 'opening_book.bin'              # Opening book loaded by the game loop if present
+TRACE_VARIABLE = 'TICTACTOE_TRACE'          # Environment variable naming a JSON Lines file for the game's trace
+SCRIPT_SEPARATOR = ';'                      # Separates the side choice and moves of a scripted game
+SYMBOL_DIGITS = {'_': 0, 'X': 1, 'O': 2}    # Base-3 digit for each symbol in a position index
+SYMBOL_LINE_BITS = {'_': 1, 'X': 2, 'O': 4}  # Bit for each symbol in the three in a row table
+POSITION_COUNT = 3 ** 9                     # Every way to fill the board with '_', 'X' and 'O'
+WIN_LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8),   # Rows, as flat square indexes (row * 3 + col)
+             (0, 3, 6), (1, 4, 7), (2, 5, 8),   # Columns
+             (0, 4, 8), (2, 4, 6))              # Diagonals
+LEGAL_MOVE_LISTS = tuple(tuple((square // 3, square % 3) for square in range(9) if mask >> square & 1)
+                         for mask in range(1 << 9))  # (row, col) moves for each legal-move bitmask
+SEQUENCE_ROWS = frozenset((list, tuple, str))   # Row types position_index() unpacks, anything else is indexed
+random_source = threading.local()           # Per-thread generator for corner and side choices, see use_random()
 
 def correct_board_state(board_state):
     """
@@ -31,6 +54,66 @@ def correct_board_state(board_state):
     if any(symbol not in allowed_symbols for row in board_state for symbol in row):
         raise ValueError("Unexpected symbols in board_state in three_in_a_row(). Must be ('_', 'X' or 'O').")
 
+def position_index(board_state):
+
+    """
+    Encodes a board as a base-3 index into the position tables, validating it on the way
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+
+    Returns:
+    - index (int): Sum of each square's digit ('_' 0, 'X' 1, 'O' 2) times 3 ** (row * 3 + col)
+
+    Raises:
+    - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols
+    - IndexError, KeyError, TypeError: If a row passes the checks but cannot be indexed by column, eg a set
+    """
+
+    try:
+        if isinstance(board_state, list):
+            (a, b, c), (d, e, f), (g, h, i) = top, middle, bottom = board_state
+            if type(top) in SEQUENCE_ROWS and type(middle) in SEQUENCE_ROWS and type(bottom) in SEQUENCE_ROWS:
+                digit = SYMBOL_DIGITS
+                return (digit[a] + 3 * digit[b] + 9 * digit[c] + 27 * digit[d] + 81 * digit[e]
+                        + 243 * digit[f] + 729 * digit[g] + 2187 * digit[h] + 6561 * digit[i])
+    except (KeyError, TypeError, ValueError):
+        pass
+
+    # Not a 3x3 matrix with valid symbols, so let the full check explain why
+    correct_board_state(board_state)
+
+    # Valid rows which are not lists, tuples or strings are indexed square by square, as the rule checks used to
+    return sum(SYMBOL_DIGITS[board_state[row][col]] * 3 ** (row * 3 + col) for row in range(3) for col in range(3))
+
+@functools.lru_cache(maxsize = None)
+def position_tables():
+
+    """
+    Builds the flat position tables once per process, indexed by position_index()
+
+    Parameters:
+    - None
+
+    Returns:
+    - lines (array): Bit 1 << digit set for each symbol with three in a row ('_' lines included)
+    - legal (array): Bit 1 << (row * 3 + col) set for each empty square
+    - terminal (array): 1 if 'X' or 'O' has three in a row or the board is full, otherwise 0
+    """
+
+    lines = array('B', bytes(POSITION_COUNT))
+    legal = array('H', bytes(2 * POSITION_COUNT))
+    terminal = array('B', bytes(POSITION_COUNT))
+    for index in range(POSITION_COUNT):
+        digits = [index // 3 ** square % 3 for square in range(9)]
+        for a, b, c in WIN_LINES:
+            if digits[a] == digits[b] == digits[c]:
+                lines[index] |= 1 << digits[a]
+        legal[index] = sum(1 << square for square in range(9) if digits[square] == 0)
+        terminal[index] = 1 if lines[index] & 6 or not legal[index] else 0
+
+    return lines, legal, terminal
+
 def draw_board(board_state):  
     """
     Draws the current state of the board  
@@ -97,32 +180,36 @@ def three_in_a_row(board_state, X_or_O):
     
     Raises:
     - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols
-    - IndexError: For potential index and out of bounds errors
-    - TypeError: For potential type errors, such as a non-string
+    - IndexError: If a row cannot be indexed by column, eg a set
+    - TypeError: If a row has no length or a square is unhashable
     """
 
-    # Ensure board_state is 3x3 matrix with valid symbols
-    correct_board_state(board_state)
-
+    # Ensure board_state is 3x3 matrix with valid symbols, then look up every line at once
     try:
-        #Check if any row contains the same symbol in all cells
-        for row in board_state:
-            if all(cell == X_or_O for cell in row):
+        lines = position_tables()[0][position_index(board_state)]
+    except (IndexError, KeyError, TypeError):
+        correct_board_state(board_state)        # Rows which are not sequences get the original square by square check
+        try:
+            #Check if any row contains the same symbol in all cells
+            for row in board_state:
+                if all(cell == X_or_O for cell in row):
+                    return True
+
+            #Check if any column contains the same symbol in all cells
+            for col in range(3):
+                if all(board_state[row][col] == X_or_O for row in range(3)):
+                    return True
+
+            #Check if any diagonal contains the same symbol in all cells
+            if all(board_state[i][i] == X_or_O for i in range(3)) or all(board_state[i][2 - i] == X_or_O for i in range(3)):
                 return True
-            
-        #Check if any column contains the same symbol in all cells
-        for col in range(3):
-            if all(board_state[row][col] == X_or_O for row in range(3)):
-                return True   
-
-        #Check if any diagonal contains the same symbol in all cells
-        if all(board_state[i][i] == X_or_O for i in range(3)) or all(board_state[i][2 - i] == X_or_O for i in range(3)):
-            return True
-    
-    except(IndexError, TypeError):
-        raise IndexError("Index or out of bounds error in board_state in draw_board()")
-    
-    return False
+
+        except(IndexError, TypeError):
+            raise IndexError("Index or out of bounds error in board_state in three_in_a_row()")
+
+        return False
+
+    return isinstance(X_or_O, str) and bool(lines & SYMBOL_LINE_BITS.get(X_or_O, 0))     # Anything else never matches a square
 
 def is_legal_move(board_state, row, col):
 
@@ -143,10 +230,14 @@ def is_legal_move(board_state, row, col):
     - TypeError: For potential type errors, such as a non-string
     """
 
-    # Ensure board_state is 3x3 matrix with valid symbols
-    correct_board_state(board_state)
+    # Ensure board_state is 3x3 matrix with valid symbols, then look up the empty squares
+    try:
+        legal = position_tables()[1][position_index(board_state)]
+    except (IndexError, KeyError, TypeError):
+        correct_board_state(board_state)        # Rows which are not sequences get the original square check
+        return -1 < row < 3 and -1 < col < 3 and board_state[row][col] == '_'
 
-    return -1 < row < 3 and -1 < col < 3 and board_state[row][col] == '_'
+    return -1 < row < 3 and -1 < col < 3 and bool(legal >> (row * 3 + col) & 1)
 
 def switch_turn(X_or_O):
 
@@ -185,19 +276,247 @@ def collect_legal_moves(board_state):
     - TypeError: For potential type errors, such as a non-string
     """
 
-    # Ensure board_state is 3x3 matrix with valid symbols
-    correct_board_state(board_state)
+    # Ensure board_state is 3x3 matrix with valid symbols, then look up the empty squares
+    try:
+        legal = position_tables()[1][position_index(board_state)]
+    except (IndexError, KeyError, TypeError):
+        correct_board_state(board_state)        # Rows which are not sequences get the original square by square scan
+        return [[row, col] for row in range(3) for col in range(3) if board_state[row][col] == '_']
 
-    legal_moves = []         # Determine remaining legal moves to see if there are game
-    for row in range(3):     # ending moves and react accordingly
-        for col in range(3):
-            try:
-                if is_legal_move(board_state, row ,col):
-                    legal_moves.append([row, col])
-            except ValueError as e:
-                logging.error(f"Error: {e}")
+    # Determine remaining legal moves to see if there are game ending moves and react accordingly
+    return [list(move) for move in LEGAL_MOVE_LISTS[legal]]
+        
+def completes_line(board_state, row, col, X_or_O):
+
+    """
+    Checks whether playing X_or_O at an empty square would give X_or_O three in a row.
+    Only the lines through the square are checked and the board is not copied or changed
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+    - row (int): The candidate row
+    - col (int): The candidate column
+    - X_or_O (string): This is the symbol which would be played
+
+    Returns:
+    - Boolean value indicating if the move would complete a row, column or diagonal
+    """
+
+    if all(board_state[row][c] == X_or_O for c in range(3) if c != col):
+        return True
+    if all(board_state[r][col] == X_or_O for r in range(3) if r != row):
+        return True
+    if row == col and all(board_state[i][i] == X_or_O for i in range(3) if i != row):
+        return True
+    if row + col == 2 and all(board_state[i][2 - i] == X_or_O for i in range(3) if i != row):
+        return True
+
+    return False
+
+def centre_stage(board_state, legal_moves, X_or_O):
+
+    """
+    Pipeline stage: if the centre is not taken, taking it is the best move
+    """
+
+    return [1, 1] if [1, 1] in legal_moves else None
+
+def win_stage(board_state, legal_moves, X_or_O):
+
+    """
+    Pipeline stage: first legal move which wins for the computer
+    """
+
+    for move in legal_moves:
+        if completes_line(board_state, move[0], move[1], X_or_O):
+            return move
+
+def block_stage(board_state, legal_moves, X_or_O):
+
+    """
+    Pipeline stage: first legal move which stops the human winning next turn
+    """
+
+    human = 'O' if X_or_O == 'X' else 'X'
+    for move in legal_moves:
+        if completes_line(board_state, move[0], move[1], human):
+            return move
+
+def random_choice(options):
+
+    """
+    Picks one of options with the calling thread's generator, the random module unless use_random() set one
+    """
+
+    return getattr(random_source, 'rng', random).choice(options)
+
+@contextlib.contextmanager
+def use_random(rng):
+
+    """
+    Makes random_choice() draw from rng in the calling thread while the block runs, so a background
+    thread can choose moves without advancing the random module's state, which --seed repeats
+
+    Parameters:
+    - rng (random.Random): Generator to draw from
+    """
+
+    previous = getattr(random_source, 'rng', random)
+    random_source.rng = rng
+    try:
+        yield
+    finally:
+        random_source.rng = previous
+
+def corner_options(board_state, legal_moves, X_or_O):
+
+    """
+    Every corner corner_stage() could choose
+    """
+
+    return [move for move in legal_moves if tuple(move) in corner_moves]
+
+def corner_stage(board_state, legal_moves, X_or_O):
+
+    """
+    Pipeline stage: random legal corner
+    """
+
+    legal_corner_moves = corner_options(board_state, legal_moves, X_or_O)
+    if legal_corner_moves:
+        return random_choice(legal_corner_moves)
+
+corner_stage.options = corner_options
+
+def side_options(board_state, legal_moves, X_or_O):
+
+    """
+    Every side side_stage() could choose
+    """
+
+    return [move for move in legal_moves if tuple(move) in side_moves]
+
+def side_stage(board_state, legal_moves, X_or_O):
+
+    """
+    Pipeline stage: random legal side
+    """
+
+    legal_side_moves = side_options(board_state, legal_moves, X_or_O)
+    if legal_side_moves:
+        return random_choice(legal_side_moves)
+
+side_stage.options = side_options
+
+def build_pipeline(stages):
+
+    """
+    Builds an ordered move-selection pipeline from stage functions.
+    Each stage takes (board_state, legal_moves, X_or_O) and returns a [row, col] move or None.
+    Stages which choose randomly set an options attribute, a function with the same parameters
+    returning every move the stage could choose
+
+    Parameters:
+    - stages (list): Stage functions in the order they should be tried
+
+    Returns:
+    - pipeline (function): Takes (board_state, X_or_O, legal_moves = None), validates the board once,
+      shares one list of legal moves between the stages and returns the move from the first stage
+      which produces one, or None. The board is not changed.
+      pipeline.candidates takes the same parameters and returns every move the pipeline could
+      return, so random choices can be covered exhaustively
+    """
+
+    stages = tuple(stages)
+
+    def pipeline(board_state, X_or_O, legal_moves = None):
 
-    return legal_moves
+        # Ensure board_state is 3x3 matrix with valid symbols
+        correct_board_state(board_state)
+
+        if legal_moves is None:
+            legal_moves = [[row, col] for row in range(3) for col in range(3) if board_state[row][col] == '_']
+
+        for stage in stages:
+            move = stage(board_state, legal_moves, X_or_O)
+            if move is not None:
+                if tracer.enabled:
+                    tracer.record('stage', stage = stage.__name__, symbol = X_or_O, move = move)
+                return move
+
+        return None
+
+    def candidates(board_state, X_or_O, legal_moves = None):
+
+        # Ensure board_state is 3x3 matrix with valid symbols
+        correct_board_state(board_state)
+
+        if legal_moves is None:
+            legal_moves = [[row, col] for row in range(3) for col in range(3) if board_state[row][col] == '_']
+
+        for stage in stages:
+            if hasattr(stage, 'options'):
+                moves = stage.options(board_state, legal_moves, X_or_O)
+            else:
+                move = stage(board_state, legal_moves, X_or_O)
+                moves = [] if move is None else [move]
+            if moves:
+                return moves
+
+        return []
+
+    pipeline.candidates = candidates
+    return pipeline
+
+computer_strategy = build_pipeline([centre_stage, win_stage, block_stage, corner_stage, side_stage])
+
+@functools.lru_cache(maxsize = None)
+def heuristic_tables():
+
+    """
+    Builds the heuristic computer's candidate moves for every position once per process,
+    indexed by position_index()
+
+    Parameters:
+    - None
+
+    Returns:
+    - tables (dict): 'X' or 'O' -> array with bit 1 << (row * 3 + col) set for each move
+      computer_strategy could choose when playing that symbol, 0 for finished games
+    """
+
+    _, _, terminal = position_tables()
+    tables = {symbol: array('H', bytes(2 * POSITION_COUNT)) for symbol in allowed_choices}
+    for index in range(POSITION_COUNT):
+        if terminal[index]:
+            continue
+        cells = [('_', 'X', 'O')[index // 3 ** square % 3] for square in range(9)]
+        board = [cells[0:3], cells[3:6], cells[6:9]]
+        for symbol, table in tables.items():
+            table[index] = sum(1 << (row * 3 + col) for row, col in computer_strategy.candidates(board, symbol))
+
+    return tables
+
+def heuristic_candidates(board_state, X_or_O):
+
+    """
+    Looks up every move the heuristic computer could choose in a position
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+    - X_or_O (string): This is the symbol which the computer is playing
+
+    Returns:
+    - moves (list): [row, col] pairs, empty if the game is over
+
+    Raises:
+    - ValueError: If board_state is not a 3x3 matrix or has unexpected symbols, or X_or_O is not 'X' or 'O'
+    """
+
+    if X_or_O not in allowed_choices:
+        raise ValueError("Unexpected symbol in heuristic_candidates(). Must be ('X' or 'O').")
+
+    return [list(move) for move in LEGAL_MOVE_LISTS[heuristic_tables()[X_or_O][position_index(board_state)]]]
         
 def find_win(board_state, legal_moves, X_or_O, move_made):
 
@@ -223,16 +542,29 @@ def find_win(board_state, legal_moves, X_or_O, move_made):
     if move_made[0]:                                       # Don't play if move already made
         return 
     
-    for move in legal_moves:
-        temp_board_state = copy.deepcopy(board_state)   # Create temporary board_state to check for potential
-        temp_board_state[move[0]][move[1]] = X_or_O     # winning moves for computer and make them
-        try:
-            if three_in_a_row(temp_board_state, X_or_O):                  
-                board_state[move[0]][move[1]] = X_or_O 
-                move_made[0] = True
-                return False
-        except Exception as e:
-            logging.error(f"Error: {e}")
+    if X_or_O not in ('X', 'O') or any(type(row) is not list for row in board_state):
+        # Other symbols and row types keep the original trial of each move on a copied board
+        for move in legal_moves:
+            temp_board_state = copy.deepcopy(board_state)
+            temp_board_state[move[0]][move[1]] = X_or_O
+            try:
+                if three_in_a_row(temp_board_state, X_or_O):
+                    board_state[move[0]][move[1]] = X_or_O
+                    move_made[0] = True
+                    return False
+            except Exception as e:
+                if tracer.enabled:
+                    tracer.record('error', function = 'find_win', message = str(e))
+        return
+
+    if legal_moves and three_in_a_row(board_state, X_or_O):    # Already three in a row, so any move keeps it
+        move = legal_moves[0]
+    else:
+        move = win_stage(board_state, legal_moves, X_or_O)
+    if move:
+        board_state[move[0]][move[1]] = X_or_O
+        move_made[0] = True
+        return False
         
 def find_block(board_state, legal_moves, X_or_O, move_made):
 
@@ -258,17 +590,30 @@ def find_block(board_state, legal_moves, X_or_O, move_made):
     if move_made[0]:                                        # Don't play if move already made
         return 
 
-    for move in legal_moves:
-        temp_board_state = copy.deepcopy(board_state)       # Create temporary board_state to check for potential winning moves
-        temp_X_or_O = 'O' if X_or_O == 'X' else 'X'         # Envision board states with human's symbol played
-        temp_board_state[move[0]][move[1]] = temp_X_or_O    
-        try:
-            if three_in_a_row(temp_board_state, temp_X_or_O):
-                board_state[move[0]][move[1]] = X_or_O
-                move_made[0] = True
-                return switch_turn(X_or_O)
-        except Exception as e:
-            logging.error(f"Error: {e}")
+    if X_or_O not in ('X', 'O') or any(type(row) is not list for row in board_state):
+        # Other symbols and row types keep the original trial of each move on a copied board
+        for move in legal_moves:
+            temp_board_state = copy.deepcopy(board_state)
+            temp_X_or_O = 'O' if X_or_O == 'X' else 'X'
+            temp_board_state[move[0]][move[1]] = temp_X_or_O
+            try:
+                if three_in_a_row(temp_board_state, temp_X_or_O):
+                    board_state[move[0]][move[1]] = X_or_O
+                    move_made[0] = True
+                    return switch_turn(X_or_O)
+            except Exception as e:
+                if tracer.enabled:
+                    tracer.record('error', function = 'find_block', message = str(e))
+        return
+
+    if legal_moves and three_in_a_row(board_state, 'O' if X_or_O == 'X' else 'X'):    # Human already has three in a row
+        move = legal_moves[0]
+    else:
+        move = block_stage(board_state, legal_moves, X_or_O)
+    if move:
+        board_state[move[0]][move[1]] = X_or_O
+        move_made[0] = True
+        return switch_turn(X_or_O)
 
 def find_corner(board_state, legal_moves, X_or_O, move_made):
 
@@ -295,14 +640,8 @@ def find_corner(board_state, legal_moves, X_or_O, move_made):
     if move_made[0]:                                # Don't play if move already made
         return 
 
-    corner_moves = [(0,0), (0,2), (2,0), (2,2)]     # Define all four corners
-    legal_corner_moves = []                         # Find and collect
-    for move in legal_moves:                        # available corner moves
-        if tuple(move) in corner_moves:                    
-            legal_corner_moves.append(move)
-    
-    if legal_corner_moves:                                  # Play random corner if there
-        random_corner = random.choice(legal_corner_moves)   # are any
+    random_corner = corner_stage(board_state, legal_moves, X_or_O)
+    if random_corner:                               # Play random corner if there are any
         board_state[random_corner[0]][random_corner[1]] = X_or_O
         move_made[0] = True
         return switch_turn(X_or_O)
@@ -332,19 +671,101 @@ def find_side(board_state, legal_moves, X_or_O, move_made):
     if move_made[0]:                                # Don't play if move already made
         return 
     
-    side_moves = [(0,1), (1,0), (1,2), (2,1)]       # Define all four sides
-    legal_side_moves = []                           # Find and collect
-    for move in legal_moves:                        # available corner moves
-        if tuple(move) in side_moves:             
-            legal_side_moves.append(move)
-    
-    if legal_side_moves:                                # Play random side if there
-        random_side = random.choice(legal_side_moves)   # are any
+    random_side = side_stage(board_state, legal_moves, X_or_O)
+    if random_side:                                 # Play random side if there are any
         board_state[random_side[0]][random_side[1]] = X_or_O
         move_made[0] = True
         return switch_turn(X_or_O)
     
-def next_move(board_state, X_or_O, first_or_second, move_made):
+def parse_move(text):
+
+    """
+    Parses a human move such as '1 3' into zero-based board coordinates
+
+    Parameters:
+    - text (string): Row (1-3) and column (1-3) separated by whitespace
+
+    Returns:
+    - (row, col) tuple, or None if text is not two integers. Range is checked by is_legal_move()
+    """
+
+    coords = text.strip().split()
+    if len(coords) == 2 and coords[0].isdigit() and coords[1].isdigit():
+        return int(coords[0]) - 1, int(coords[1]) - 1
+
+    return None
+
+def choose_move(board_state, X_or_O, opening_book = None):
+
+    """
+    Chooses the computer's move without printing, logging, asking for input or changing the board
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+    - X_or_O (string): This is the symbol which the computer is playing
+    - opening_book (OpeningBook): Optional book probed before the heuristics
+
+    Returns:
+    - (row, col) tuple of the chosen move
+
+    Raises:
+    - ValueError: If board_state is not a 3x3 matrix, has unexpected symbols or has no legal moves
+    """
+
+    move = None
+    if opening_book:                                                    # Opening positions come straight from the book,
+        correct_board_state(board_state)                                # once the board is known to be valid
+        move = opening_book.probe(board_state)
+    source = 'book'
+
+    if not move:                                                        # Otherwise centre, win, block, corner, side
+        move = computer_strategy(board_state, X_or_O)
+        source = 'pipeline'
+        if move is None:
+            if tracer.enabled:
+                tracer.record('error', function = 'choose_move', message = "No legal moves")
+            raise ValueError("No legal moves in board_state in choose_move().")
+
+    if tracer.enabled:
+        tracer.record('move', symbol = X_or_O, move = move, source = source)
+
+    return tuple(move)
+
+def apply_move(board_state, move, X_or_O):
+
+    """
+    Plays a move on the board and reports the outcome, without printing or logging
+
+    Parameters:
+    - board_state (list): 2D array which tracks empty squares and squares with symbols
+    - move (tuple): (row, col) of the square to play
+    - X_or_O (string): This is the symbol being played
+
+    Returns:
+    - 'win' if the move gives X_or_O three in a row, 'draw' if it fills the board, otherwise 'continue'
+
+    Raises:
+    - ValueError: If board_state is not a 3x3 matrix, has unexpected symbols, X_or_O is not 'X' or 'O'
+      or the move is not to an empty square
+    """
+
+    if X_or_O not in allowed_choices:
+        raise ValueError("Unexpected symbol in apply_move(). Must be ('X' or 'O').")
+
+    row, col = move
+    if not is_legal_move(board_state, row, col):
+        raise ValueError("That is not an available square in apply_move().")
+
+    board_state[row][col] = X_or_O
+    if completes_line(board_state, row, col, X_or_O):
+        return 'win'
+    if not any('_' in board_row for board_row in board_state):
+        return 'draw'
+
+    return 'continue'
+
+def next_move(board_state, X_or_O, first_or_second, move_made, opening_book = None, ponderer = None, read_input = None,
+              game_log = None, session_id = 0):
 
     """
     Main game driver   
@@ -354,6 +775,11 @@ def next_move(board_state, X_or_O, first_or_second, move_made):
     - X_or_O (string): This is the symbol which the current player is playing
     - first_or_second (string): Track whether player is first (X) or second (O)
     - move_made (boolean): Prevents computer from making multiple moves
+    - opening_book (OpeningBook): Optional book probed before the heuristics on the computer's turn
+    - ponderer (Ponderer): Optional background search of the computer's replies while the human thinks
+    - read_input (function): Reads the human's move given a prompt, defaults to input()
+    - game_log (GameLog): Optional log which every move, and the end of the game, is recorded in
+    - session_id (int): This game's session in game_log
 
     Return:
     - X_or_O (string): Symbol of the next player. If this value is False it will end the program
@@ -369,49 +795,198 @@ def next_move(board_state, X_or_O, first_or_second, move_made):
     legal_moves = collect_legal_moves(board_state)  # Determine remaining legal moves            
     if not legal_moves:                             # and end game if there are none
         print("Drawn game")
+        if game_log:
+            game_log.end_game(session_id)
         return False
     
     if first_or_second == X_or_O:   # Ask player for their move if it's their turn
+        if ponderer:                # Work out replies while waiting for input
+            ponderer.start(board_state, X_or_O, switch_turn(X_or_O))
+
         while True:
-            coords = input("Please input row (1-3) and column (1-3) (eg 1 3): ").strip().split()
-            
-            if len(coords) == 2 and coords[0].isdigit() and coords[1].isdigit(): 
-                row, col = map(int, coords)
-                row -= 1
-                col -= 1
+            move = parse_move((read_input or input)("Please input row (1-3) and column (1-3) (eg 1 3): "))
             
-                if is_legal_move(board_state, row, col):
-                    board_state[row][col] = X_or_O
-                    break
-                else:
-                    print("That is not an available square.")
-
-            else:
+            if move is None:
                 print("Please enter two integers between 1 and 3 separated by a space.")
+            elif is_legal_move(board_state, move[0], move[1]):
+                if tracer.enabled:
+                    tracer.record('move', symbol = X_or_O, move = move, source = 'human')
+                break
+            else:
+                print("That is not an available square.")
 
     else:
-        if board_state[1][1] == '_':    # If the centre is not taken, taking it is the best move
-            board_state[1][1] = X_or_O
-        
-        else:  
-            move_made[0] = False                           # Track if Computer move is made so it won't make multiple
-          
-            find_win(board_state, legal_moves, X_or_O, move_made)       # Check if computer can win
-            find_block(board_state, legal_moves, X_or_O, move_made)     # Check if human can win
-            find_corner(board_state, legal_moves, X_or_O, move_made)    # Check if corner space is available
-            find_side(board_state, legal_moves, X_or_O, move_made)      # Check if side space is available
+        move = ponderer.reply(board_state, X_or_O) if ponderer else choose_move(board_state, X_or_O, opening_book)
+        move_made[0] = True
    
-    if three_in_a_row(board_state, X_or_O):              # Check if anyone wins
+    outcome = apply_move(board_state, move, X_or_O)
+    if game_log:
+        game_log.record_move(session_id, move, X_or_O)
+
+    if outcome == 'win':                            # Check if anyone wins
+        if game_log:
+            game_log.end_game(session_id)
         print("{} wins!".format(X_or_O))
         draw_board(board_state)
         return False
 
     return switch_turn(X_or_O)
 
+def play_scripted_game(line, opening_book = None, ponderer = None, game_log = None, session_id = 0):
+
+    """
+    Plays one game from a script line through next_move(), exactly as the terminal game would,
+    with the human's inputs read from the line and printing suppressed. The line holds the
+    human's side choice and moves as they would be typed, separated by SCRIPT_SEPARATOR,
+    eg 'X;1 1;3 3;1 3'. Inputs which are re-prompted in the terminal game are counted as rejected
+
+    Parameters:
+    - line (string): Side choice followed by the human's moves
+    - opening_book (OpeningBook): Optional book probed before the heuristics
+    - ponderer (Ponderer): Optional background search of the computer's replies
+    - game_log (GameLog): Optional log which the game is recorded in
+    - session_id (int): This game's session in game_log
+
+    Returns:
+    - result (string): 'X' or 'O' for the winner, 'draw', 'incomplete' if the moves ran out
+      or 'invalid' if the side choice is not 'X' or 'O'
+    - plies (int): Moves played
+    - rejected (int): Human inputs skipped because they were malformed or illegal
+    """
+
+    inputs = line.split(SCRIPT_SEPARATOR)
+    first_or_second = inputs[0].strip().upper()     # Same allowances as player_choice()
+    if first_or_second not in allowed_choices:
+        return 'invalid', 0, 0
+
+    human_moves = iter(inputs[1:])
+    consumed = [0]
+    def read_input(prompt):
+        for text in human_moves:
+            consumed[0] += 1
+            return text
+        raise EOFError                              # As input() does at the end of a piped script
+
+    board_state = [['_'] * 3 for _ in range(3)]
+    X_or_O = 'X'
+    result = None
+    if game_log:
+        game_log.start_game(session_id, first_or_second)
+    with contextlib.redirect_stdout(None):          # print() does nothing while sys.stdout is None
+        try:
+            while X_or_O:
+                X_or_O = next_move(board_state, X_or_O, first_or_second, [False], opening_book, ponderer, read_input,
+                                   game_log, session_id)
+        except EOFError:
+            result = 'incomplete'
+            if game_log:                            # The script has no more moves, so it can never resume
+                game_log.end_game(session_id)
+        finally:
+            if ponderer:
+                ponderer.stop()
+
+    plies = sum(cell != '_' for row in board_state for cell in row)
+    human_plies = sum(cell == first_or_second for row in board_state for cell in row)
+    if result is None:
+        result = 'X' if three_in_a_row(board_state, 'X') else 'O' if three_in_a_row(board_state, 'O') else 'draw'
+
+    return result, plies, consumed[0] - human_plies
+
+def run_script(script_file, results_file, opening_book = None, ponderer = None, game_log = None, first_session = 0):
+
+    """
+    Plays every game in a script back to back and writes one compact result line per game,
+    'result plies rejected', eg 'O 6 0'. Blank lines and lines starting with '#' are skipped
+
+    Parameters:
+    - script_file (file): Open text file or pipe with one scripted game per line
+    - results_file (file): Open text file to write results to
+    - opening_book (OpeningBook): Optional book probed before the heuristics
+    - ponderer (Ponderer): Optional background search of the computer's replies
+    - game_log (GameLog): Optional log which every game is recorded in
+    - first_session (int): Session id in game_log of the first game, the rest count up from it
+
+    Returns:
+    - games (int): Number of games played
+    """
+
+    games = 0
+    for line in script_file:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        results = play_scripted_game(line, opening_book, ponderer, game_log, first_session + games)
+        results_file.write("{} {} {}\n".format(*results))
+        games += 1
+
+    return games
+
 # Game loop
 if __name__ == '__main__':
-    first_or_second = player_choice()           #Tracks if player is X's or O's
-    while True:
-        X_or_O = next_move(board_state, X_or_O, first_or_second, move_made)
-        if not X_or_O:
-            break
\ No newline at end of file
+    parser = argparse.ArgumentParser(description = "A simple, text-based tic tac toe game")
+    parser.add_argument('--script', help = "Play scripted games from this file ('-' for stdin) instead of prompting")
+    parser.add_argument('--output', help = "File for scripted game results, defaults to stdout")
+    parser.add_argument('--seed', type = int, help = "Seed for the computer's random corner and side choices")
+    parser.add_argument('--ponder', action = 'store_true', help = "Work out the computer's replies while you think")
+    parser.add_argument('--log', help = "Append every game's moves to this crash-safe game log")
+    args = parser.parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    book = None
+    if os.path.exists(BOOK_PATH):               # Use the opening book if one has been built
+        from opening_book import OpeningBook
+        book = OpeningBook(BOOK_PATH)
+
+    trace_path = os.environ.get(TRACE_VARIABLE)
+    if trace_path:                              # Trace the game and write it out when it ends
+        tracer.enable()
+
+    ponderer = None
+    if args.ponder:
+        from ponder import Ponderer
+        ponderer = Ponderer(functools.partial(choose_move, opening_book = book), args.seed)
+
+    session_id = time.time_ns()                 # Unique across runs appending to the same log
+    with contextlib.ExitStack() as files:
+        game_log = None
+        resumed = None
+        if args.log:
+            from gamelog import GameLog, recover
+            sessions = recover(args.log)        # Games left unfinished by a crash
+            game_log = files.enter_context(GameLog(args.log))
+            if sessions and not args.script:    # Pick up the latest one, session ids count up with time
+                resumed = max(sessions)
+            for stale in sessions:              # End the rest, so later restarts do not find them again
+                if stale != resumed:
+                    game_log.end_game(stale)
+
+        if args.script:                         # Scripted games never prompt
+            script_file = sys.stdin if args.script == '-' else files.enter_context(open(args.script))
+            results_file = files.enter_context(open(args.output, 'w')) if args.output else sys.stdout
+            start = time.perf_counter()
+            games = run_script(script_file, results_file, book, ponderer, game_log, session_id)
+            elapsed = time.perf_counter() - start
+            results_file.flush()
+            print("{} games in {:.3f}s ({:.0f} games/sec)".format(games, elapsed, games / elapsed if elapsed else 0),
+                  file = sys.stderr)
+        else:
+            if resumed is not None:
+                session_id = resumed
+                board_state = sessions[resumed]['board_state']
+                X_or_O = sessions[resumed]['X_or_O']
+                first_or_second = sessions[resumed]['first_or_second']
+                print("Resuming your unfinished game as {}".format(first_or_second))
+            else:
+                first_or_second = player_choice()   #Tracks if player is X's or O's
+                if game_log:
+                    game_log.start_game(session_id, first_or_second)
+            while True:
+                X_or_O = next_move(board_state, X_or_O, first_or_second, move_made, book, ponderer,
+                                   game_log = game_log, session_id = session_id)
+                if not X_or_O:
+                    break
+
+    if trace_path:
+        with open(trace_path, 'a') as trace_file:
+            tracer.export_jsonl(trace_file)
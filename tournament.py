@@ -0,0 +1,262 @@
+import argparse
+import itertools
+import math
+import pickle
+import random
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from tictactoe import (
+    apply_move,
+    choose_move,
+    collect_legal_moves,
+    switch_turn,
+)
+from solver import best_moves
+
+strategies = {}             # Registered move-selection strategies, by name
+CHUNK_SIZE = 500            # Games per worker task, so large matches spread across the pool (even, so sides stay balanced)
+ELO_ITERATIONS = 500        # Rounds of the rating fit
+
+def register_strategy(name):
+
+    """
+    Decorator which registers a move-selection strategy for tournaments.
+    A strategy takes (board_state, X_or_O) and returns the (row, col) it wants to play,
+    and must not change board_state
+
+    Parameters:
+    - name (string): Name the strategy is entered under
+
+    Returns:
+    - Decorator which registers and returns the strategy unchanged
+    """
+
+    def decorator(strategy):
+        strategies[name] = strategy
+        return strategy
+
+    return decorator
+
+@register_strategy('heuristic')
+def heuristic_strategy(board_state, X_or_O):
+
+    """
+    The game's own computer player: centre, win, block, corner, then side
+    """
+
+    return choose_move(board_state, X_or_O)
+
+@register_strategy('random')
+def random_strategy(board_state, X_or_O):
+
+    """
+    Plays a uniformly random legal move
+    """
+
+    return random.choice(collect_legal_moves(board_state))
+
+@register_strategy('perfect')
+def perfect_strategy(board_state, X_or_O):
+
+    """
+    Plays a random choice among the moves the solver rates best
+    """
+
+    return random.choice(best_moves(board_state, X_or_O))
+
+def play_game(x_strategy, o_strategy):
+
+    """
+    Plays one game between two strategies from the empty board
+
+    Parameters:
+    - x_strategy (function): Strategy playing 'X' (first)
+    - o_strategy (function): Strategy playing 'O' (second)
+
+    Returns:
+    - 'X' or 'O' for the winner, or None for a drawn game
+
+    Raises:
+    - ValueError: If a strategy chooses an illegal move
+    """
+
+    board_state = [['_'] * 3 for _ in range(3)]
+    X_or_O = 'X'
+    players = {'X': x_strategy, 'O': o_strategy}
+    while True:
+        outcome = apply_move(board_state, players[X_or_O](board_state, X_or_O), X_or_O)
+        if outcome == 'win':
+            return X_or_O
+        if outcome == 'draw':
+            return None
+        X_or_O = switch_turn(X_or_O)
+
+def play_match(strategy_a, strategy_b, games, seed):
+
+    """
+    Plays a batch of games between two strategies, swapping sides every game.
+    Runs in worker processes, which only share the registry with the parent when they are forked,
+    so run_tournament() passes the strategy functions themselves. They are pickled as a module and
+    name and imported again in the worker, whichever start method the pool uses
+
+    Parameters:
+    - strategy_a (string or function): First strategy, by registered name or the function itself,
+      which plays 'X' in even-numbered games
+    - strategy_b (string or function): Second strategy
+    - games (int): Number of games to play
+    - seed (int): Seed for the random choices made by the strategies
+
+    Returns:
+    - [wins for strategy_a, draws, wins for strategy_b]
+    """
+
+    random.seed(seed)
+    if isinstance(strategy_a, str):
+        strategy_a = strategies[strategy_a]
+    if isinstance(strategy_b, str):
+        strategy_b = strategies[strategy_b]
+    score = [0, 0, 0]
+    for game in range(games):
+        a_is_X = game % 2 == 0
+        result = play_game(strategy_a, strategy_b) if a_is_X else play_game(strategy_b, strategy_a)
+        if result is None:
+            score[1] += 1
+        elif (result == 'X') == a_is_X:
+            score[0] += 1
+        else:
+            score[2] += 1
+
+    return score
+
+def run_tournament(names, games, processes = None, seed = 0, mp_context = None):
+
+    """
+    Plays a round robin between registered strategies across a process pool
+
+    Parameters:
+    - names (list): Strategy names to enter
+    - games (int): Games per pairing
+    - processes (int): Worker processes, defaults to one per CPU
+    - seed (int): Base seed, so tournaments can be repeated
+    - mp_context (multiprocessing context): Start method for the pool, defaults to the platform's
+
+    Returns:
+    - results (dict): (name_a, name_b) -> [wins for name_a, draws, wins for name_b]
+    - games_per_second (float): Overall throughput
+
+    Raises:
+    - ValueError: If a name is not a registered strategy, or its strategy cannot be imported by
+      name in a worker process, such as a lambda or a function defined inside another function
+    """
+
+    unknown = [name for name in names if name not in strategies]
+    if unknown:
+        raise ValueError("Unknown strategies in run_tournament(): {}.".format(', '.join(unknown)))
+
+    for name in names:
+        try:
+            pickle.dumps(strategies[name])
+        except (pickle.PicklingError, AttributeError, TypeError):
+            raise ValueError("Strategy '{}' must be defined at module level to run in run_tournament().".format(name))
+
+    results = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers = processes, mp_context = mp_context) as pool:
+        futures = []
+        task = 0
+        for pairing in itertools.combinations(names, 2):
+            results[pairing] = [0, 0, 0]
+            for offset in range(0, games, CHUNK_SIZE):
+                chunk = min(CHUNK_SIZE, games - offset)
+                strategy_a, strategy_b = strategies[pairing[0]], strategies[pairing[1]]
+                futures.append((pairing, pool.submit(play_match, strategy_a, strategy_b, chunk, seed + task)))
+                task += 1
+        for pairing, future in futures:
+            for i, count in enumerate(future.result()):
+                results[pairing][i] += count
+    elapsed = time.perf_counter() - start
+
+    total_games = sum(sum(score) for score in results.values())
+    return results, total_games / elapsed if elapsed else float('inf')
+
+def elo_ratings(results):
+
+    """
+    Estimates Elo ratings from match results with a Bradley-Terry fit, counting draws as half a win.
+    Each pairing gets one extra virtual draw so unbeaten strategies still get a finite rating
+
+    Parameters:
+    - results (dict): Output of run_tournament()
+
+    Returns:
+    - ratings (dict): Name -> Elo rating, with the field averaging 0
+    """
+
+    names = sorted({name for pairing in results for name in pairing})
+    wins = {name: 0.0 for name in names}
+    played = {}
+    for (name_a, name_b), (a_wins, draws, b_wins) in results.items():
+        wins[name_a] += a_wins + (draws + 1) / 2
+        wins[name_b] += b_wins + (draws + 1) / 2
+        played[name_a, name_b] = played[name_b, name_a] = a_wins + draws + b_wins + 1
+
+    strength = {name: 1.0 for name in names}
+    for _ in range(ELO_ITERATIONS):                 # Minorization-maximization updates
+        for name in names:
+            denominator = sum(games / (strength[name] + strength[other])
+                              for (player, other), games in played.items() if player == name)
+            if denominator:
+                strength[name] = wins[name] / denominator
+
+    ratings = {name: 400 * math.log10(strength[name]) for name in names}
+    mean = sum(ratings.values()) / len(ratings) if ratings else 0
+    return {name: rating - mean for name, rating in ratings.items()}
+
+def format_report(results, games_per_second):
+
+    """
+    Formats the win/draw/loss matrix, Elo ratings and throughput of a tournament
+
+    Parameters:
+    - results (dict): Output of run_tournament()
+    - games_per_second (float): Output of run_tournament()
+
+    Returns:
+    - report (string): Multi-line report, rows read as "row strategy wins-draws-losses against column"
+    """
+
+    ratings = elo_ratings(results)
+    names = sorted(ratings, key = ratings.get, reverse = True)
+    width = max(len(name) for name in names) + 2
+    cell_width = max(len('-'.join(map(str, score))) for score in results.values()) + 2
+
+    lines = [' ' * width + ''.join(name.rjust(cell_width) for name in names)]
+    for row in names:
+        cells = []
+        for col in names:
+            if (row, col) in results:
+                cells.append('-'.join(map(str, results[row, col])))
+            elif (col, row) in results:
+                cells.append('-'.join(map(str, reversed(results[col, row]))))
+            else:
+                cells.append('')
+        lines.append(row.ljust(width) + ''.join(cell.rjust(cell_width) for cell in cells))
+
+    lines.append('')
+    for name in names:
+        lines.append("{}{:+.0f}".format(name.ljust(width), ratings[name]))
+    lines.append('')
+    lines.append("{:.0f} games/sec".format(games_per_second))
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Round-robin tournament between move-selection strategies")
+    parser.add_argument('names', nargs = '*', default = sorted(strategies), help = "Strategies to enter")
+    parser.add_argument('--games', type = int, default = 1000, help = "Games per pairing")
+    parser.add_argument('--processes', type = int, default = None, help = "Worker processes")
+    parser.add_argument('--seed', type = int, default = 0, help = "Base random seed")
+    args = parser.parse_args()
+
+    results, games_per_second = run_tournament(args.names, args.games, args.processes, args.seed)
+    print(format_report(results, games_per_second))
@@ -0,0 +1,97 @@
+import collections
+import contextlib
+import json
+import threading
+import time
+
+TRACE_CAPACITY = 4096       # Events kept before the oldest are overwritten
+
+class Tracer:
+
+    """
+    Fixed-size in-memory ring buffer of structured events such as move decisions, stage hits and errors.
+    Call sites check tracer.enabled before calling record(), so a disabled tracer costs one attribute
+    lookup and nothing is formatted until the buffer is exported
+    """
+
+    def __init__(self, capacity = TRACE_CAPACITY):
+
+        """
+        Parameters:
+        - capacity (int): Number of events kept; older events are dropped once it is full
+        """
+
+        self.enabled = False
+        self.events = collections.deque(maxlen = capacity)
+        self.recorded = 0
+        self.local = threading.local()      # Per-thread suppression, see suppressed()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self.events.clear()
+        self.recorded = 0
+
+    @contextlib.contextmanager
+    def suppressed(self):
+
+        """
+        Drops every event recorded by the calling thread while the block runs, eg for background
+        work whose decisions are not the game's. Other threads keep recording
+        """
+
+        previous = getattr(self.local, 'suppressed', False)
+        self.local.suppressed = True
+        try:
+            yield
+        finally:
+            self.local.suppressed = previous
+
+    @property
+    def dropped(self):
+
+        """
+        Number of events overwritten because the buffer was full
+        """
+
+        return self.recorded - len(self.events)
+
+    def record(self, event, **fields):
+
+        """
+        Appends an event to the buffer. Fields are stored as passed and only converted on export
+
+        Parameters:
+        - event (string): Kind of event, eg 'move', 'stage' or 'error'
+        - fields: Event details, which must be JSON serializable (tuples become lists)
+
+        Returns:
+        - None
+        """
+
+        if self.enabled and not getattr(self.local, 'suppressed', False):
+            self.events.append((time.time_ns(), event, fields))
+            self.recorded += 1
+
+    def export_jsonl(self, trace_file):
+
+        """
+        Writes the buffered events, oldest first, as JSON Lines
+
+        Parameters:
+        - trace_file (file): Open text file to write to
+
+        Returns:
+        - Number of events written
+        """
+
+        for timestamp, event, fields in list(self.events):
+            trace_file.write(json.dumps({'ts': timestamp, 'event': event, **fields}) + '\n')
+
+        return len(self.events)
+
+tracer = Tracer()           # Shared tracer used by the game
@@ -0,0 +1,347 @@
+import argparse
+import functools
+import time
+
+from array import array
+from tictactoe import SYMBOL_LINE_BITS, POSITION_COUNT, WIN_LINES, parse_move, player_choice, position_tables, switch_turn
+
+TERNARY = tuple(sum(3 ** square for square in range(9) if mask >> square & 1) for mask in range(1 << 9))    # 9-bit mask -> base-3 digits of 1, for position_index()
+LINE_MASKS = tuple(sum(1 << square for square in line) for line in WIN_LINES)  # Each win line as a 9-bit mask
+BITS = tuple(tuple(square for square in range(9) if mask >> square & 1) for mask in range(1 << 9))    # Set bits of each 9-bit mask
+FULL = (1 << 9) - 1                         # Every square of a 3x3 board
+LINE_WEIGHTS = (0, 1, 4)                    # Score for a line holding 0, 1 or 2 of one symbol's stones and none of the other's
+META_WEIGHTS = (0, 30, 120)                 # The same for lines of won sub-boards on the meta-board
+SUB_BOARD_WIN = 50                          # Score for each sub-board won
+WIN_SCORE = 100000                          # Score for winning the game, less one per ply so quicker wins score higher
+MAX_TIME = 0.5                              # Seconds choose_ultimate_move() searches for
+MAX_DEPTH = 64                              # Plies choose_ultimate_move() deepens to if time allows
+
+def to_square(row, col):
+
+    """
+    Converts (row, col) on the 9x9 grid to a square, sub-board * 9 + cell, where sub-boards and
+    their cells are both numbered 0-8 in row order
+    """
+
+    return (row // 3 * 3 + col // 3) * 9 + row % 3 * 3 + col % 3
+
+def to_grid(square):
+
+    """
+    Converts a square, sub-board * 9 + cell, to (row, col) on the 9x9 grid
+    """
+
+    sub_board, cell = divmod(square, 9)
+    return sub_board // 3 * 3 + cell // 3, sub_board % 3 * 3 + cell % 3
+
+@functools.lru_cache(maxsize = None)
+def ultimate_tables():
+
+    """
+    Builds the 3x3 tables used by the ultimate search, indexed by position_index() like position_tables()
+
+    Parameters:
+    - None
+
+    Returns:
+    - scores (array): LINE_WEIGHTS summed over the lines still open to 'X', less the same for 'O'
+    - threats (array): Bit 1 << square set for each empty square which completes a line for 'X',
+      and bit 1 << (9 + square) for 'O'
+    """
+
+    scores = array('h', bytes(2 * POSITION_COUNT))
+    threats = array('l', bytes(array('l').itemsize * POSITION_COUNT))
+    for index in range(POSITION_COUNT):
+        digits = [index // 3 ** square % 3 for square in range(9)]
+        for line in WIN_LINES:
+            line_digits = [digits[square] for square in line]
+            for digit, sign, shift in ((1, 1, 0), (2, -1, 9)):
+                if line_digits.count(3 - digit) == 0 and line_digits.count(digit) < 3:
+                    scores[index] += sign * LINE_WEIGHTS[line_digits.count(digit)]
+                    if line_digits.count(digit) == 2:
+                        threats[index] |= 1 << (shift + line[line_digits.index(0)])
+
+    return scores, threats
+
+class UltimateBoard:
+
+    """
+    Ultimate tic tac toe: nine 3x3 sub-boards, where the cell a move is played in sends the
+    opponent to the sub-board in the same place, or anywhere if that sub-board is won or full.
+    Three won sub-boards in a row wins the game. Each sub-board is a pair of 9-bit masks
+    (bitboards), and the meta-board is the masks of won and closed sub-boards; wins are looked
+    up in the same table as three_in_a_row() through position_index() = TERNARY[x] + 2 * TERNARY[o]
+    """
+
+    def __init__(self):
+        self.masks = {'X': [0] * 9, 'O': [0] * 9}
+        self.won = {'X': 0, 'O': 0}         # Sub-boards each symbol has won
+        self.closed = 0                     # Sub-boards which are won or full
+        self.forced = -1                    # Sub-board the next move must be played in, or -1 for any
+        self.X_or_O = 'X'                   # Symbol to move; X is always first
+        self.result = None                  # 'X', 'O' or 'draw' once the game is over
+        self.history = []                   # State needed to undo each move
+        self.lines, _, self.terminal = position_tables()
+        zobrist = array('Q', bytes(8 * (2 * 81 + 10)))
+        seed = 0x9E3779B97F4A7C15
+        for i in range(len(zobrist)):       # Fixed xorshift sequence, so hashes are repeatable
+            seed ^= seed << 13 & 0xFFFFFFFFFFFFFFFF
+            seed ^= seed >> 7
+            seed ^= seed << 17 & 0xFFFFFFFFFFFFFFFF
+            zobrist[i] = seed
+        self.zobrist = zobrist              # 'X' squares, then 'O' squares, then forced sub-board + 1
+        self.hash = zobrist[2 * 81]
+
+    def legal_moves(self):
+
+        """
+        Returns the squares the player to move may play, empty once the game is over
+        """
+
+        if self.result:
+            return []
+
+        x, o = self.masks['X'], self.masks['O']
+        sub_boards = (self.forced,) if self.forced >= 0 else BITS[FULL & ~self.closed]
+        return [sub_board * 9 + cell for sub_board in sub_boards for cell in BITS[FULL & ~(x[sub_board] | o[sub_board])]]
+
+    def play(self, square):
+
+        """
+        Plays a square, sub-board * 9 + cell, for the symbol to move
+
+        Raises:
+        - ValueError: If the game is over or the square is not legal
+        """
+
+        sub_board, cell = divmod(square, 9)
+        X_or_O = self.X_or_O
+        masks = self.masks[X_or_O]
+        if (self.result or not 0 <= square < 81 or self.closed >> sub_board & 1
+                or (self.forced >= 0 and sub_board != self.forced)
+                or (self.masks['X'][sub_board] | self.masks['O'][sub_board]) >> cell & 1):
+            raise ValueError("That is not an available square in play().")
+
+        self.history.append((square, self.forced, self.won[X_or_O], self.closed, self.result))
+        masks[sub_board] |= 1 << cell
+        index = TERNARY[self.masks['X'][sub_board]] + 2 * TERNARY[self.masks['O'][sub_board]]
+        if self.lines[index] & SYMBOL_LINE_BITS[X_or_O]:    # Sub-board won, so check the meta-board
+            self.won[X_or_O] |= 1 << sub_board
+            self.closed |= 1 << sub_board
+            if self.lines[TERNARY[self.won['X']] + 2 * TERNARY[self.won['O']]] & SYMBOL_LINE_BITS[X_or_O]:
+                self.result = X_or_O
+        elif self.terminal[index]:                          # Sub-board full
+            self.closed |= 1 << sub_board
+        if not self.result and self.closed == FULL:
+            self.result = 'draw'
+
+        forced = -1 if self.closed >> cell & 1 else cell
+        offset = 0 if X_or_O == 'X' else 81
+        self.hash ^= self.zobrist[offset + square] ^ self.zobrist[162 + self.forced + 1] ^ self.zobrist[162 + forced + 1]
+        self.forced = forced
+        self.X_or_O = switch_turn(X_or_O)
+
+    def undo(self):
+
+        """
+        Takes back the last move, reversing play()
+
+        Raises:
+        - IndexError: If no moves have been played
+        """
+
+        square, forced, won, self.closed, self.result = self.history.pop()
+        X_or_O = switch_turn(self.X_or_O)
+        sub_board, cell = divmod(square, 9)
+        self.masks[X_or_O][sub_board] &= ~(1 << cell)
+        self.won[X_or_O] = won
+        offset = 0 if X_or_O == 'X' else 81
+        self.hash ^= self.zobrist[offset + square] ^ self.zobrist[162 + self.forced + 1] ^ self.zobrist[162 + forced + 1]
+        self.forced = forced
+        self.X_or_O = X_or_O
+
+    def sub_board(self, sub_board):
+
+        """
+        Returns one sub-board as a 3x3 list of lists of '_', 'X' and 'O', as used by tictactoe.py
+        """
+
+        x, o = self.masks['X'][sub_board], self.masks['O'][sub_board]
+        return [['X' if x >> square & 1 else 'O' if o >> square & 1 else '_' for square in range(row * 3, row * 3 + 3)]
+                for row in range(3)]
+
+    def evaluate(self):
+
+        """
+        Scores the position for the symbol to move: open lines on the open sub-boards, plus won
+        sub-boards and the meta-board lines they are on
+        """
+
+        scores = ultimate_tables()[0]
+        x, o = self.masks['X'], self.masks['O']
+        won_x, won_o, closed = self.won['X'], self.won['O'], self.closed
+        score = 0
+        for sub_board in BITS[FULL & ~closed]:
+            score += scores[TERNARY[x[sub_board]] + 2 * TERNARY[o[sub_board]]]
+
+        score += SUB_BOARD_WIN * (len(BITS[won_x]) - len(BITS[won_o]))
+        for line in LINE_MASKS:
+            if not closed & ~won_x & line:                  # Line open to 'X'
+                score += META_WEIGHTS[len(BITS[won_x & line])]
+            if not closed & ~won_o & line:
+                score -= META_WEIGHTS[len(BITS[won_o & line])]
+
+        return score if self.X_or_O == 'X' else -score
+
+    def __str__(self):
+        rows = []
+        for row in range(9):
+            cells = [self.sub_board(row // 3 * 3 + col // 3)[row % 3][col % 3] for col in range(9)]
+            rows.append(' | '.join(' '.join(cells[col:col + 3]) for col in (0, 3, 6)))
+            if row in (2, 5):
+                rows.append('------+-------+------')
+        return '\n'.join(rows)
+
+class SearchTimeout(Exception):
+
+    """
+    Raised inside search() to abandon an iteration when time runs out
+    """
+
+def search(board, max_time = MAX_TIME, max_depth = MAX_DEPTH):
+
+    """
+    Iterative-deepening negamax with alpha-beta pruning and a transposition table keyed by
+    Zobrist hash. Each iteration tries the previous best move first, then moves which win a
+    sub-board, and leaves moves which give the opponent a free choice of sub-board until last
+
+    Parameters:
+    - board (UltimateBoard): Position to search, left as it was
+    - max_time (float): Seconds to search for; the deepest finished iteration is used
+    - max_depth (int): Most plies to search
+
+    Returns:
+    - square (int): Best move found, sub-board * 9 + cell, or None if the game is over
+    - score (int): Its score for the symbol to move, over WIN_SCORE - 100 for a forced win
+    - depth (int): Plies searched by the last finished iteration
+    """
+
+    moves = board.legal_moves()
+    if not moves:
+        return None, 0, 0
+
+    threats = ultimate_tables()[1]
+    table = {}                                      # hash -> (depth, score, bound, best square)
+    deadline = time.perf_counter() + max_time
+    nodes = [0]
+
+    def ordered(moves, best):
+        x, o = board.masks['X'], board.masks['O']
+        shift = 0 if board.X_or_O == 'X' else 9
+        closed = board.closed
+
+        def key(square):
+            if square == best:
+                return 0
+            sub_board, cell = divmod(square, 9)
+            if threats[TERNARY[x[sub_board]] + 2 * TERNARY[o[sub_board]]] >> (shift + cell) & 1:
+                return 1                            # Wins the sub-board
+            if closed >> cell & 1 or cell == sub_board:
+                return 3                            # Opponent may be free to play anywhere
+            return 2
+
+        return sorted(moves, key = key)
+
+    def negamax(depth, ply, alpha, beta):
+        nodes[0] += 1
+        if not nodes[0] & 1023 and time.perf_counter() > deadline:
+            raise SearchTimeout
+
+        if board.result:
+            return 0 if board.result == 'draw' else -(WIN_SCORE - ply)     # Previous move ended the game
+        if depth == 0:
+            return board.evaluate()
+
+        entry = table.get(board.hash)
+        best = None
+        if entry:
+            entry_depth, score, bound, best = entry
+            if entry_depth >= depth:
+                if bound == 0 or (bound < 0 and score <= alpha) or (bound > 0 and score >= beta):
+                    return score
+
+        start_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        for square in ordered(board.legal_moves(), best):
+            board.play(square)
+            try:
+                score = -negamax(depth - 1, ply + 1, -beta, -alpha)
+            finally:
+                board.undo()
+            if score > best_score:
+                best_score, best = score, square
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        bound = -1 if best_score <= start_alpha else 1 if best_score >= beta else 0     # Upper, lower or exact
+        table[board.hash] = (depth, best_score, bound, best)
+        return best_score
+
+    best_square, best_score, finished = moves[0], 0, 0
+    for depth in range(1, max_depth + 1):
+        try:
+            score = negamax(depth, 0, -WIN_SCORE - 1, WIN_SCORE + 1)
+        except SearchTimeout:
+            break
+        best_square, best_score, finished = table[board.hash][3], score, depth
+        if abs(score) > WIN_SCORE - 100 or time.perf_counter() > deadline:    # Result is known, or no time for another iteration
+            break
+
+    return best_square, best_score, finished
+
+def choose_ultimate_move(board, max_time = MAX_TIME):
+
+    """
+    Chooses the computer's move with search()
+
+    Parameters:
+    - board (UltimateBoard): Position with the computer to move
+    - max_time (float): Seconds to think for
+
+    Returns:
+    - (row, col) tuple on the 9x9 grid
+
+    Raises:
+    - ValueError: If the game is over
+    """
+
+    square = search(board, max_time)[0]
+    if square is None:
+        raise ValueError("No legal moves in choose_ultimate_move().")
+
+    return to_grid(square)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = "Ultimate tic tac toe against the computer")
+    parser.add_argument('--time', type = float, default = MAX_TIME, help = "Seconds the computer thinks per move")
+    args = parser.parse_args()
+
+    board = UltimateBoard()
+    first_or_second = player_choice()
+    while not board.result:
+        print(board)
+        if board.X_or_O == first_or_second:
+            move = parse_move(input("Your move, row and column (1-9): "))
+            if move is None or not all(0 <= coord < 9 for coord in move) or to_square(*move) not in board.legal_moves():
+                print("That is not a legal move{}.".format(
+                    '' if board.forced < 0 else ", play in sub-board {}".format(board.forced + 1)))
+                continue
+            board.play(to_square(*move))
+        else:
+            row, col = choose_ultimate_move(board, args.time)
+            print("Computer plays {} {}".format(row + 1, col + 1))
+            board.play(to_square(row, col))
+
+    print(board)
+    print("It's a draw!" if board.result == 'draw' else "{} wins!".format(board.result))